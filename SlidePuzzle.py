@@ -1,25 +1,40 @@
+import argparse
 import pygame as pg
-import random
-import math
-from typing import Tuple, List, Any
+from concurrent.futures import Future
+from typing import Dict, Iterator, Optional, Sequence, Tuple, List, Any
+
+# The game logic lives in `engine`, the rest is also re-exported for code that used it from here
+from engine import Board, generate_solvable_board, get_partition, get_valid_moves, is_perfect_square, slide_square_at
+from hints import HintService
+from pattern_database import is_database_available
+from profiling import FrameProfiler
+from fast_solver import solve_fast
+from scheduler import Animation, Interval, Scheduler, Task, run_in_background
+from solver import solve
 
 # For dev purposes only
 Never = Any
 
-pg.init()
-
 WIDTH, HEIGHT = 1000, 800
-WIN = pg.display.set_mode((WIDTH, HEIGHT))
-pg.display.set_caption("Slide Puzzle")
 
 FPS = 60
 
+# Durations in milliseconds
+SLIDE_ANIMATION_DURATION = 120
+SOLUTION_PLAYBACK_INTERVAL = 250
+HINT_POLL_INTERVAL = 50
+
 TEMP_BOARD_LENGTH = 9
 
+# Larger boards get no hints and solutions from the fast (non-optimal) solver even with a pattern
+# database, optimal searches on them take minutes
+OPTIMAL_SOLVER_MAX_ROW_COUNT = 4
+
 SLIDE_SQUARE_COLOR = pg.Color("brown1")
 BACKGROUND_COLOR = pg.Color("white")
 MAIN_BOARD_COLOR = pg.Color("gray80")
 BORDER_COLOR = TEXT_COLOR = pg.Color("black")
+HINT_COLOR = pg.Color("gold")
 
 MAIN_BOARD_SIDE_LENGTH = 600
 MAIN_BOARD_CENTER_X = WIDTH//2
@@ -27,6 +42,14 @@ MAIN_BOARD_CENTER_Y = HEIGHT//2
 MAIN_BOARD_LEFT = MAIN_BOARD_CENTER_X - MAIN_BOARD_SIDE_LENGTH//2
 MAIN_BOARD_TOP = MAIN_BOARD_CENTER_Y - MAIN_BOARD_SIDE_LENGTH//2
 
+# Squares are labelled from a digit atlas instead of pre-rendered surfaces from this many rows on
+GLYPH_ATLAS_MIN_ROW_COUNT = 8
+MAX_NUMBER_FONT_SIZE = 36
+
+# Text in the top left corner of the window (the frame timings of `--profile`)
+OVERLAY_MARGIN = 5
+OVERLAY_FONT_SIZE = 16
+
 RESET_BTN_WIDTH, RESET_BTN_HEIGHT = 150, 50
 RESET_BTN_CENTER_X = MAIN_BOARD_CENTER_X
 RESET_BTN_CENTER_Y = ((MAIN_BOARD_TOP + MAIN_BOARD_SIDE_LENGTH) + HEIGHT) // 2
@@ -34,173 +57,423 @@ RESET_BTN_LEFT = RESET_BTN_CENTER_X - RESET_BTN_WIDTH//2
 RESET_BTN_TOP = RESET_BTN_CENTER_Y - RESET_BTN_HEIGHT//2
 
 
-def main() -> None:
+def main(board_length: int = TEMP_BOARD_LENGTH, profile_path: Optional[str] = None) -> None:
+    """
+    Parameters
+    ----------
+    `profile_path`:
+        If given, the time every frame spends on events, updates and drawing is shown in the top left
+        corner and written to this CSV file on exit.
+    """
+    init_window()
     clock = pg.time.Clock()
+    scheduler = Scheduler()
     running = True
-    board = generate_solvable_board(TEMP_BOARD_LENGTH)
-
+    board = generate_solvable_board(board_length)
+    solution_playback: Optional[Task] = None
+    # The solution searched for in the background, a search can't be stopped so only one runs at a time
+    solution: Optional["Future[List[int]]"] = None
+    hint_service: Optional[HintService] = None
+    profiler = FrameProfiler() if profile_path is not None else None
+
+    draw_window(board)
     while running:
-        clock.tick(FPS)  # Make sure to cap the FPS of the game to 60
-        for event in pg.event.get():
+        # Only tick at the FPS cap while a task needs it, otherwise sleep until the next event
+        # (or until the next task is due)
+        wait_time = scheduler.time_until_next(pg.time.get_ticks())
+        if hint_service is not None and hint_service.pending is not None:
+            # Wake up to show the hint being searched for in the background once it is found
+            wait_time = HINT_POLL_INTERVAL if wait_time is None else min(wait_time, HINT_POLL_INTERVAL)
+        if wait_time is None:
+            events = [pg.event.wait()]
+        elif wait_time > 0:
+            events = [pg.event.wait(wait_time)]
+        else:
+            clock.tick(FPS)  # Make sure to cap the FPS of the game to 60
+            events = []
+        events += pg.event.get()
+        if profiler is not None:
+            profiler.start_frame()
+
+        for event in events:
             if event.type == pg.QUIT:
                 running = False
+            elif event.type == pg.VIDEOEXPOSE:
+                # The window contents may have been lost, redraw everything
+                get_renderer().invalidate()
+            elif event.type == pg.KEYUP and event.key == pg.K_h and can_solve_optimally(board.row_count):
+                # Toggle highlighting the square to slide next
+                hint_service = None if hint_service is not None else HintService(board.row_count)
+            elif event.type == pg.KEYUP and event.key == pg.K_s and (solution is None or solution.done()):
+                # Play back a solution from the current board, dropping the one being played
+                scheduler.cancel(solution_playback)
+                solution = find_solution(board)
+                solution_playback = scheduler.add(start_solution_playback(board, solution, scheduler))
             elif event.type == pg.MOUSEBUTTONUP:
                 mouse_pos = pg.mouse.get_pos()
-                # if the mouse clicked in the main board boundry
-                if (MAIN_BOARD_LEFT <= mouse_pos[0] <= MAIN_BOARD_LEFT + MAIN_BOARD_SIDE_LENGTH and \
-                    MAIN_BOARD_TOP <= mouse_pos[1] <= MAIN_BOARD_TOP + MAIN_BOARD_SIDE_LENGTH
-                ):
-                    handle_square_sliding(mouse_pos, board)
+                # if the mouse clicked on the squares of the main board
+                if get_board_rect(board.row_count).collidepoint(mouse_pos):
+                    empty_sq_index = board.empty
+                    slid_sq_index = handle_square_sliding(mouse_pos, board)
+                    if slid_sq_index is not None:
+                        animate_slide(scheduler, slid_sq_index, empty_sq_index)
                 # if reset button was click
                 elif (RESET_BTN_LEFT <= mouse_pos[0] <= RESET_BTN_LEFT + RESET_BTN_WIDTH and \
                     RESET_BTN_TOP <= mouse_pos[1] <= RESET_BTN_TOP + RESET_BTN_HEIGHT      
                 ):
-                    board = generate_solvable_board(TEMP_BOARD_LENGTH)
+                    scheduler.cancel(solution_playback)
+                    scheduler.cancel(get_renderer().slide_animation)
+                    get_renderer().sliding = None
+                    board = generate_solvable_board(board_length)
+
+        if profiler is not None:
+            profiler.lap("events")
+
+        scheduler.update(pg.time.get_ticks())
+        get_renderer().hint_square = hint_service.poll_hint(board) if hint_service is not None else None
+        if profiler is not None:
+            profiler.lap("update")
+            get_renderer().overlay_lines = profiler.summary()
 
         draw_window(board)
+        if profiler is not None:
+            profiler.lap("draw")
+            profiler.end_frame()
 
     pg.quit()
-
-def generate_solvable_board(board_length: int) -> List[int]:
+    if profiler is not None:
+        profiler.write_csv(profile_path)
+
+def animate_slide(scheduler: Scheduler, src: int, dst: int) -> None:
+    """Show the square that slid from index `src` to `dst` moving there, replacing any running slide animation."""
+    renderer = get_renderer()
+    scheduler.cancel(renderer.slide_animation)
+    renderer.sliding = (src, dst, 0.0)
+    renderer.slide_animation = scheduler.add(
+        Animation(pg.time.get_ticks(), SLIDE_ANIMATION_DURATION, renderer.set_slide_progress))
+
+def can_solve_optimally(row_count: int) -> bool:
+    """Whether boards of `row_count` rows get hints and optimal solutions, which need a pattern database."""
+    return row_count <= OPTIMAL_SOLVER_MAX_ROW_COUNT and is_database_available(row_count)
+
+def find_solution(board: Board) -> "Future[List[int]]":
     """
-    Parameters
-    ----------
-    `board_length`:
-        The number of elements that the returned board should have (must be a perfect square)
+    Solve a copy of `board` in a background thread, so the window keeps responding. The solution is
+    optimal if `can_solve_optimally` and comes from `solve_fast` otherwise.
+    """
+    board = board.copy()
+    if can_solve_optimally(board.row_count):
+        return run_in_background(lambda: solve(board).moves)
+    return run_in_background(lambda: solve_fast(board))
 
+def start_solution_playback(board: Board, solution: "Future[List[int]]", scheduler: Scheduler) -> Task:
+    """
     Returns
     -------
-    A solveable board of randomly ordered numbers
-
-    Raises
-    ------
-    ValueError
-        If `board_length` is not a perfect square
+    A task that waits for `solution` (see `find_solution`) of `board`, then slides its squares one by one.
+    It stops early once the board is not where the solution left it (e.g. the player moved a square).
     """
-    # Validate parameter
-    if not is_perfect_square(board_length):
-        raise ValueError(f"`board_length` {board_length} is not a perfect square")
-
-    # Generate a solved board
-    board = list(range(1, board_length))
-    board.append(0)
-
-    # Perform a random number of valid moves (odd count) to shuffle the board
-    num_moves = random.randint(20, 100)
-    if num_moves % 2 == 0:
-        num_moves += 1
-    
-    for _ in range(num_moves):
-        valid_moves = get_valid_moves(board)
-        move = random.choice(valid_moves)
-        board[move[0]], board[move[1]] = board[move[1]], board[move[0]]
-
-    return board
-
-def is_perfect_square(num: int) -> bool:
-    return num == math.isqrt(num) ** 2
-
-def get_valid_moves(board: List[int]) -> List[Tuple[int, int]]:
-    board_length = len(board)
-    row_count = int(math.sqrt(board_length))
-    empty_index = board.index(0)
-    valid_moves = []
-
-    # if there is a square left of the empty square (if left of the empty square is in the board range)
-    if 0 <= empty_index - 1 <= board_length - 1:
-        valid_moves.append((empty_index, empty_index - 1))
-    # if there is a square right of the empty square
-    if 0 <= empty_index + 1 <= board_length - 1:
-        valid_moves.append((empty_index, empty_index + 1))
-    # if there is a square above the empty square
-    if 0 <= empty_index - row_count <= board_length - 1:
-        valid_moves.append((empty_index, empty_index - row_count))
-    # if there is a square below the empty square
-    if 0 <= empty_index + row_count <= board_length - 1:
-        valid_moves.append((empty_index, empty_index + row_count))
-
-    return valid_moves
-
-def handle_square_sliding(square_pos: Tuple[int, int], board: List[int]) -> None:
+    moves: Optional[Iterator[int]] = None
+    # The board as the moves played so far left it
+    expected = board.copy()
+
+    def play_next_move() -> bool:
+        nonlocal moves
+        if board.key != expected.key:
+            return False
+        if moves is None:
+            if not solution.done():
+                return True
+            moves = iter(solution.result())
+        sq_index = next(moves, None)
+        if sq_index is None:
+            return False
+        empty_sq_index = board.empty
+        board.slide(sq_index)
+        expected.slide(sq_index)
+        animate_slide(scheduler, sq_index, empty_sq_index)
+        return True
+
+    return Interval(pg.time.get_ticks(), SOLUTION_PLAYBACK_INTERVAL, play_next_move)
+
+def init_window() -> pg.Surface:
+    """Initialize pygame and open the game window (nothing is displayed before this is called)."""
+    pg.init()
+    window = pg.display.set_mode((WIDTH, HEIGHT))
+    pg.display.set_caption("Slide Puzzle")
+    return window
+
+def handle_square_sliding(square_pos: Tuple[int, int], board: Board) -> Optional[int]:
     """
     Parameters
     ----------
-    `mouse_pos`:
+    `square_pos`:
         The current coordinates of the square to slide.
 
-    `board_list`:
-        The integers that each represent the number of the slide square. The list will modified if there was a square that slid.
+    `board`:
+        The board to slide the square in. The board will modified if there was a square that slid.
 
     Returns
     -------
-    None.
-    """
-    row_count = int(math.sqrt(len(board)))
-    column_index = get_partition(
-        square_pos[0], MAIN_BOARD_LEFT, MAIN_BOARD_LEFT + MAIN_BOARD_SIDE_LENGTH, row_count)
-    row_index = get_partition(
-        square_pos[1], MAIN_BOARD_TOP, MAIN_BOARD_TOP + MAIN_BOARD_SIDE_LENGTH, row_count)
-    sq_index = row_count * row_index + column_index
-    empty_sq_index = board.index(0)
-
-    # Swap the empty square number (0) with the square number gotten from `square_pos`
-    if empty_sq_index % row_count == 0:  # if the empty square is at the left-most column
-        # Swap if legal
-        if sq_index in (empty_sq_index + 1, empty_sq_index + row_count, empty_sq_index - row_count):
-            board[empty_sq_index], board[sq_index] = board[sq_index], board[empty_sq_index]
-    elif empty_sq_index % row_count == row_count - 1:  # if the empty square is at the right-most column
-        # Swap if legal
-        if sq_index in (empty_sq_index - 1, empty_sq_index + row_count, empty_sq_index - row_count):
-            board[empty_sq_index], board[sq_index] = board[sq_index], board[empty_sq_index]
-    else:  # if the empty square is at a column in the middle
-        # Swap if legal
-        if sq_index in (empty_sq_index - 1, empty_sq_index + 1, empty_sq_index + row_count, empty_sq_index - row_count):
-            board[empty_sq_index], board[sq_index] = board[sq_index], board[empty_sq_index]
-
-
-def get_partition(x: int, min_number: int, max_number: int, partition_count: int) -> int:
+    The index of the square that slid, None if the square can't slide.
     """
-    Divide the range `min_number`-`max_number` (both ends excluded) to `partition_count` partitions and find in index of the partition that `x` is in
-
-    Parameters
-    ----------
-    `x`:
-        The number to find in which partition it is in.
+    return slide_square_at(square_pos, board, MAIN_BOARD_LEFT, MAIN_BOARD_TOP, get_board_rect(board.row_count).width)
 
-    `min_number`:
-        The minimum number in the range that x is expected to be in (excluded from the range).
+def get_board_rect(row_count: int) -> pg.Rect:
+    """
+    The part of the main board covered by squares. Squares have a whole number of pixels per side,
+    so on boards whose row count does not divide `MAIN_BOARD_SIDE_LENGTH` it is a bit smaller.
+    """
+    board_side_length = MAIN_BOARD_SIDE_LENGTH // row_count * row_count
+    return pg.Rect(MAIN_BOARD_LEFT, MAIN_BOARD_TOP, board_side_length, board_side_length)
 
-    `max_number`:
-        The max number in the range that x is expected to be in (excluded from the range).
 
-    `partition_count`:
-        The number partitions to divide the range into.
+class GlyphAtlas:
+    """
+    The digits 0-9 of a font rendered once side by side onto one surface.
 
-    Returns
-    -------
-    The index of the partition that `x` is in.
+    Numbers are drawn by blitting parts of it, so labelling a square renders no text and large
+    boards need no pre-rendered surface per square.
+    """
 
-    Raises
-    ------
-    ValueError
-        If `x` is not the interval (`min_number`, `max_number`)
+    def __init__(self, font: pg.font.Font, color: pg.Color) -> None:
+        glyphs = [font.render(digit, True, color) for digit in "0123456789"]
+        self.height = max(glyph.get_height() for glyph in glyphs)
+        self.surface = pg.Surface((sum(glyph.get_width() for glyph in glyphs), self.height), pg.SRCALPHA)
+        # The area of every digit in `surface`
+        self.rects: List[pg.Rect] = []
+        left = 0
+        for glyph in glyphs:
+            self.rects.append(pg.Rect(left, 0, glyph.get_width(), glyph.get_height()))
+            # Copy the glyph as is instead of blending it with the transparent surface
+            self.surface.blit(glyph, (left, 0), special_flags=pg.BLEND_RGBA_MAX)
+            left += glyph.get_width()
+        self.surface = self.surface.convert_alpha()
+
+    def draw_number(self, surface: pg.Surface, number: int, center: Tuple[int, int]) -> None:
+        rects = [self.rects[int(digit)] for digit in str(number)]
+        left = center[0] - sum(rect.width for rect in rects) // 2
+        top = center[1] - self.height // 2
+        for rect in rects:
+            surface.blit(self.surface, (left, top), rect)
+            left += rect.width
+
+
+class Renderer:
     """
-    if x < min_number or x > max_number:
-        raise ValueError(
-            f"x ({x}) is outside the range ({min_number}, {max_number}).")
-    range_size = max_number - min_number
-    partition_size = range_size / partition_count
-    x_relative = x - min_number
-    partition_index = int(x_relative // partition_size)
-    return partition_index
+    Draws the game onto `surface`, reusing the fonts and the pre-rendered slide squares between frames.
+    Squares of boards with `GLYPH_ATLAS_MIN_ROW_COUNT` rows or more are labelled from a `GlyphAtlas`.
 
+    Only the squares that changed since the last frame are redrawn and passed to `pg.display.update`.
+    """
 
-def draw_window(board: List[int]) -> None:
+    def __init__(self, surface: pg.Surface) -> None:
+        self.surface = surface
+        self.reset_label_font = pg.font.SysFont("timesnewroman", 30)
+        self.overlay_font = pg.font.SysFont("couriernew", OVERLAY_FONT_SIZE)
+        # Fonts of the square numbers and their digit atlases, keyed by square side length
+        self.number_fonts: Dict[int, pg.font.Font] = {}
+        self.glyph_atlases: Dict[int, GlyphAtlas] = {}
+        # Pre-rendered slide squares keyed by (square number, side length)
+        self.square_surfaces: Dict[Tuple[int, int], pg.Surface] = {}
+        # The squares as they are currently shown, None forces a full redraw
+        self.drawn_squares: Optional[List[int]] = None
+        # (source index, destination index, progress) of the square that is sliding on screen
+        self.sliding: Optional[Tuple[int, int, float]] = None
+        self.slide_animation: Optional[Task] = None
+        # The indices covered by the sliding square in the last frame
+        self.drawn_sliding: Tuple[int, ...] = ()
+        # The index of the square to highlight as a hint, as it should be and as it is shown
+        self.hint_square: Optional[int] = None
+        self.drawn_hint_square: Optional[int] = None
+        # The lines of the overlay as they should be and as they are shown, and the area they cover
+        self.overlay_lines: List[str] = []
+        self.drawn_overlay_lines: List[str] = []
+        self.drawn_overlay_rect: Optional[pg.Rect] = None
+
+    def invalidate(self) -> None:
+        """Redraw the whole window on the next frame (e.g. after the window was exposed)."""
+        self.drawn_squares = None
+
+    def set_slide_progress(self, progress: float) -> None:
+        if self.sliding is not None:
+            src, dst, _ = self.sliding
+            self.sliding = None if progress >= 1.0 else (src, dst, progress)
+
+    def get_number_font(self, side_length: int) -> pg.font.Font:
+        font = self.number_fonts.get(side_length)
+        if font is None:
+            font = self.number_fonts[side_length] = pg.font.SysFont(
+                "timesnewroman", min(MAX_NUMBER_FONT_SIZE, side_length // 2))
+        return font
+
+    def get_glyph_atlas(self, side_length: int) -> GlyphAtlas:
+        atlas = self.glyph_atlases.get(side_length)
+        if atlas is None:
+            atlas = self.glyph_atlases[side_length] = GlyphAtlas(self.get_number_font(side_length), TEXT_COLOR)
+        return atlas
+
+    def get_square_surface(self, sq_num: int, side_length: int) -> pg.Surface:
+        key = (sq_num, side_length)
+        square_surface = self.square_surfaces.get(key)
+        if square_surface is None:
+            square_surface = pg.Surface((side_length, side_length)).convert()
+            square_surface.fill(SLIDE_SQUARE_COLOR)
+            pg.draw.rect(square_surface, BORDER_COLOR, square_surface.get_rect(), 1)
+
+            # Draw the number of the square
+            slide_square_number = self.get_number_font(side_length).render(str(sq_num), True, TEXT_COLOR)
+            slide_square_number_rect = slide_square_number.get_rect()
+            slide_square_number_rect.center = square_surface.get_rect().center
+            square_surface.blit(slide_square_number, slide_square_number_rect)
+            self.square_surfaces[key] = square_surface
+        return square_surface
+
+    def get_square_rect(self, board: Board, pos: int) -> pg.Rect:
+        row_count = board.row_count
+        slide_square_side_length = MAIN_BOARD_SIDE_LENGTH // row_count
+        return pg.Rect(MAIN_BOARD_LEFT + (pos % row_count) * slide_square_side_length,
+                       MAIN_BOARD_TOP + (pos // row_count) * slide_square_side_length,
+                       slide_square_side_length, slide_square_side_length)
+
+    def blit_square(self, board: Board, sq_num: int, rect: pg.Rect) -> None:
+        """Draw square number `sq_num` of `board` at `rect`."""
+        if board.row_count < GLYPH_ATLAS_MIN_ROW_COUNT:
+            self.surface.blit(self.get_square_surface(sq_num, rect.width), rect)
+        else:
+            self.surface.fill(SLIDE_SQUARE_COLOR, rect)
+            pg.draw.rect(self.surface, BORDER_COLOR, rect, 1)
+            self.get_glyph_atlas(rect.width).draw_number(self.surface, sq_num, rect.center)
+
+    def draw_square(self, board: Board, pos: int, hide: bool = False) -> pg.Rect:
+        """
+        Draw the square at index `pos` (the main board background if it is empty or `hide` is set)
+        and return its rect.
+        """
+        slide_square = self.get_square_rect(board, pos)
+        sq_num = board[pos]
+        if sq_num != 0 and not hide:
+            self.blit_square(board, sq_num, slide_square)
+            if pos == self.hint_square:
+                pg.draw.rect(self.surface, HINT_COLOR, slide_square, max(2, slide_square.width // 50))
+        else:
+            # Restore the main board background and the part of its border under the square
+            self.surface.fill(MAIN_BOARD_COLOR, slide_square)
+            self.surface.set_clip(slide_square)
+            pg.draw.rect(self.surface, BORDER_COLOR, pg.Rect(
+                MAIN_BOARD_LEFT, MAIN_BOARD_TOP, MAIN_BOARD_SIDE_LENGTH, MAIN_BOARD_SIDE_LENGTH), 2)
+            self.surface.set_clip(None)
+        return slide_square
+
+    def draw_sliding_square(self, board: Board) -> None:
+        """Draw the sliding square between its source and destination (already drawn as empty)."""
+        src, dst, progress = self.sliding
+        src_rect = self.get_square_rect(board, src)
+        dst_rect = self.get_square_rect(board, dst)
+        left = round(src_rect.left + (dst_rect.left - src_rect.left) * progress)
+        top = round(src_rect.top + (dst_rect.top - src_rect.top) * progress)
+        self.blit_square(board, board[dst], pg.Rect(left, top, dst_rect.width, dst_rect.height))
+
+    def draw_overlay(self) -> List[pg.Rect]:
+        """Replace the overlay shown with `overlay_lines` and return the rects that changed."""
+        dirty_rects = []
+        if self.drawn_overlay_rect is not None:
+            self.surface.fill(BACKGROUND_COLOR, self.drawn_overlay_rect)
+            dirty_rects.append(self.drawn_overlay_rect)
+        self.drawn_overlay_rect = None
+        top = OVERLAY_MARGIN
+        for line in self.overlay_lines:
+            label_rect = self.surface.blit(self.overlay_font.render(line, True, TEXT_COLOR), (OVERLAY_MARGIN, top))
+            self.drawn_overlay_rect = label_rect if self.drawn_overlay_rect is None \
+                else self.drawn_overlay_rect.union(label_rect)
+            top = label_rect.bottom
+        if self.drawn_overlay_rect is not None:
+            dirty_rects.append(self.drawn_overlay_rect)
+        return dirty_rects
+
+    def draw_full(self, board: Board) -> List[pg.Rect]:
+        # Window background color
+        self.surface.fill(BACKGROUND_COLOR)
+
+        # Draw the main board and its background color
+        main_board = main_board_color_rect = pg.Rect(
+            MAIN_BOARD_LEFT, MAIN_BOARD_TOP, MAIN_BOARD_SIDE_LENGTH, MAIN_BOARD_SIDE_LENGTH)
+        pg.draw.rect(self.surface, MAIN_BOARD_COLOR, main_board_color_rect)
+        pg.draw.rect(self.surface, BORDER_COLOR, main_board, 2)
+
+        # Draw squares to slide
+        sliding_dst = self.sliding[1] if self.sliding is not None else None
+        for pos, sq_num in enumerate(board):
+            if sq_num != 0 and pos != sliding_dst:
+                self.draw_square(board, pos)
+        if self.sliding is not None:
+            self.draw_sliding_square(board)
+
+        # This is a temporary feature
+        # Draw the reset button
+        reset_btn = pg.Rect(RESET_BTN_LEFT, RESET_BTN_TOP, RESET_BTN_WIDTH, RESET_BTN_HEIGHT)
+        pg.draw.rect(self.surface, BORDER_COLOR, reset_btn, 2)
+
+        reset_btn_label = self.reset_label_font.render("Reset", True, TEXT_COLOR)
+        reset_btn_label_rect = reset_btn_label.get_rect()
+        reset_btn_label_rect.center = reset_btn.center
+        self.surface.blit(reset_btn_label, reset_btn_label_rect)
+
+        self.drawn_overlay_rect = None
+        self.draw_overlay()
+        return [self.surface.get_rect()]
+
+    def draw(self, board: Board) -> List[pg.Rect]:
+        """
+        Bring the surface up to date with `board`.
+
+        Returns
+        -------
+        The rects that changed (empty if nothing did).
+        """
+        squares = board.to_list()
+        if self.drawn_squares is None or len(self.drawn_squares) != len(squares):
+            dirty_rects = self.draw_full(board)
+        else:
+            changed = {pos for pos, (sq_num, drawn_sq_num) in enumerate(zip(squares, self.drawn_squares))
+                       if sq_num != drawn_sq_num}
+            # Squares under the sliding square in this or the last frame are redrawn as well
+            sliding = self.sliding[:2] if self.sliding is not None else ()
+            changed.update(self.drawn_sliding, sliding)
+            if self.hint_square != self.drawn_hint_square:
+                changed.update(pos for pos in (self.hint_square, self.drawn_hint_square) if pos is not None)
+            dirty_rects = [self.draw_square(board, pos, hide=bool(sliding) and pos == sliding[1])
+                           for pos in changed]
+            if sliding:
+                self.draw_sliding_square(board)
+            if self.overlay_lines != self.drawn_overlay_lines:
+                dirty_rects += self.draw_overlay()
+        self.drawn_squares = squares
+        self.drawn_overlay_lines = list(self.overlay_lines)
+        self.drawn_sliding = self.sliding[:2] if self.sliding is not None else ()
+        self.drawn_hint_square = self.hint_square
+        return dirty_rects
+
+
+_renderer: Optional[Renderer] = None
+
+
+def get_renderer() -> Renderer:
+    """The renderer of the game window, created on first use."""
+    global _renderer
+    if _renderer is None:
+        _renderer = Renderer(pg.display.get_surface())
+    return _renderer
+
+
+def draw_window(board: Board) -> None:
     """
+    Draw `board` and update the display. Only the squares that changed since the previous call are redrawn.
+
     Parameters
     ----------
     `board`:
-        List of 9 numbers corresponding to the order of the squares in the board
+        Board of n*n numbers (9 for a 3x3 board) corresponding to the order of the squares in the board
         where the number is the index that the square should be in after solving the puzzle + 1.
         - The list should be considered a flattened matrix.
         - The place that the empty square resides in should be annotated with 0 in the given list.
@@ -212,7 +485,7 @@ def draw_window(board: List[int]) -> None:
             |   | 5 | 8 |
             | 7 | 4 | 6 |
             ```
-            What `board` should be:
+            What `board` should hold:
                 [3, 1, 2, 0, 5, 8, 7, 4, 6]
 
     Returns
@@ -222,61 +495,27 @@ def draw_window(board: List[int]) -> None:
     Raises
     ------
     TypeError
-        If `board` is not a list of integers
-
-    ValueError
-        If the number of integers in `board` is not a perfect square
+        If `board` is not a `Board`
     """
-
-    # Window background color
-    WIN.fill(BACKGROUND_COLOR)
-
     # Validate parameter
-    if not isinstance(board, list) or not all([isinstance(element, int) for element in board]):
-        raise TypeError("board must be a list of integers")
-
-    if not is_perfect_square(len(board)):
-        raise ValueError("The number of integers in the board must be a perfect square")
-
-    # Draw the main board and its background color
-    main_board = main_board_color_rect = pg.Rect(
-        MAIN_BOARD_LEFT, MAIN_BOARD_TOP, MAIN_BOARD_SIDE_LENGTH, MAIN_BOARD_SIDE_LENGTH)
-    pg.draw.rect(WIN, MAIN_BOARD_COLOR, main_board_color_rect)
-    pg.draw.rect(WIN, BORDER_COLOR, main_board, 2)
-
-    # Draw squares to slide + determine empty square position
-    number_font = pg.font.SysFont("timesnewroman", 36)
-    for pos, sq_num in enumerate(board):
-        if (sq_num != 0):
-            # Draw the slide squares
-            slide_square_side_length = MAIN_BOARD_SIDE_LENGTH // math.sqrt(
-                len(board))
-            slide_square = slide_square_color_rect = pg.Rect(MAIN_BOARD_LEFT + ((pos % 3)*slide_square_side_length), MAIN_BOARD_TOP + (
-                (pos // 3)*slide_square_side_length), slide_square_side_length, slide_square_side_length)
-            pg.draw.rect(WIN, SLIDE_SQUARE_COLOR, slide_square_color_rect)
-            pg.draw.rect(WIN, BORDER_COLOR, slide_square, 1)
-
-            # Draw the numbers of the squares
-            slide_square_number = number_font.render(
-                str(sq_num), True, TEXT_COLOR)
-            slide_square_number_rect = slide_square_number.get_rect()
-            slide_square_number_rect.center = slide_square.center
-            WIN.blit(slide_square_number, slide_square_number_rect)
-
-    # This is a temporary feature
-    # Draw the reset button
-    reset_btn = pg.Rect(RESET_BTN_LEFT, RESET_BTN_TOP, RESET_BTN_WIDTH, RESET_BTN_HEIGHT)
-    pg.draw.rect(WIN, BORDER_COLOR, reset_btn, 2)
+    if not isinstance(board, Board):
+        raise TypeError("board must be a Board")
 
-    reset_label_font = pg.font.SysFont("timesnewroman", 30)
-    reset_btn_label = reset_label_font.render("Reset", True, TEXT_COLOR)
-    reset_btn_label_rect = reset_btn_label.get_rect()
-    reset_btn_label_rect.center = reset_btn.center
-    WIN.blit(reset_btn_label, reset_btn_label_rect)
+    dirty_rects = get_renderer().draw(board)
+    if dirty_rects:
+        pg.display.update(dirty_rects)
 
 
-    pg.display.update()
+def _main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Play the slide puzzle.")
+    parser.add_argument("--size", type=int, default=None, help="row count of the board (default: 3)")
+    parser.add_argument("--profile", nargs="?", const="profile.csv", default=None, metavar="CSV",
+                        help="show frame timings and write them to CSV on exit (default: profile.csv)")
+    args = parser.parse_args(argv)
+    if args.size is not None and args.size < 2:
+        parser.error("--size must be at least 2")
+    main(args.size ** 2 if args.size is not None else TEMP_BOARD_LENGTH, args.profile)
 
 
 if __name__ == "__main__":
-    main()
+    _main()
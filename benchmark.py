@@ -0,0 +1,161 @@
+"""
+Benchmarks of the hot paths of the game, run without a window (SDL's dummy video driver).
+
+Every call is timed on its own, and each benchmark reports its throughput and latency percentiles
+for every board size:
+    python benchmark.py
+    python benchmark.py --sizes 3 4 30 --iterations 5000 --csv benchmark.csv
+"""
+import argparse
+import csv
+import os
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from engine import generate_solvable_board, get_valid_moves
+from profiling import percentile
+from SlidePuzzle import draw_window, get_board_rect, get_renderer, handle_square_sliding, init_window
+
+DEFAULT_SIZES = (3, 4, 5, 10, 30)
+PERCENTILES = (0.5, 0.9, 0.99)
+
+# Boards the per-board benchmarks cycle through, so a single lucky board does not skew them
+BOARD_POOL_SIZE = 16
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    row_count: int
+    durations: Sequence[float]
+    """Seconds taken by every call, in increasing order."""
+
+    @property
+    def calls_per_second(self) -> float:
+        total = sum(self.durations)
+        return len(self.durations) / total if total > 0 else float("inf")
+
+    def fields(self) -> Dict[str, str]:
+        """The result as the columns of the report, latencies in microseconds."""
+        fields = {"benchmark": self.name, "size": f"{self.row_count}x{self.row_count}",
+                  "calls": str(len(self.durations)), "calls/s": f"{self.calls_per_second:,.0f}"}
+        for fraction in PERCENTILES:
+            fields[f"p{fraction * 100:g} us"] = f"{percentile(self.durations, fraction) * 1e6:.2f}"
+        fields["max us"] = f"{self.durations[-1] * 1e6:.2f}"
+        return fields
+
+
+def time_calls(call: Callable[[int], object], iterations: int, max_seconds: float,
+               prepare: Optional[Callable[[int], object]] = None) -> List[float]:
+    """
+    Time `call(i)` for i = 0, 1, ... until `iterations` calls are done or they took `max_seconds`.
+    `prepare(i)`, if given, runs before every call and is not timed.
+
+    Returns
+    -------
+    The duration of every call in seconds, in increasing order.
+    """
+    durations = []
+    total = 0.0
+    for i in range(iterations):
+        if prepare is not None:
+            prepare(i)
+        start = time.perf_counter()
+        call(i)
+        duration = time.perf_counter() - start
+        durations.append(duration)
+        total += duration
+        if total >= max_seconds:
+            break
+    durations.sort()
+    return durations
+
+
+def benchmark_size(row_count: int, iterations: int, max_seconds: float, rng: random.Random) -> List[BenchmarkResult]:
+    board_length = row_count * row_count
+    boards = [generate_solvable_board(board_length, rng) for _ in range(BOARD_POOL_SIZE)]
+    results = [BenchmarkResult("generate_solvable_board", row_count, time_calls(
+        lambda i: generate_solvable_board(board_length, rng), iterations, max_seconds))]
+    results.append(BenchmarkResult("get_valid_moves", row_count, time_calls(
+        lambda i: get_valid_moves(boards[i % BOARD_POOL_SIZE]), iterations, max_seconds)))
+
+    # Clicks anywhere on the squares, like a player would (most of them do not slide anything)
+    board_rect = get_board_rect(row_count)
+    clicks = [(rng.randrange(board_rect.left, board_rect.right), rng.randrange(board_rect.top, board_rect.bottom))
+              for _ in range(iterations)]
+    board = boards[0].copy()
+    results.append(BenchmarkResult("handle_square_sliding", row_count, time_calls(
+        lambda i: handle_square_sliding(clicks[i], board), iterations, max_seconds)))
+
+    # A frame after every slide (made before the timer starts), drawing only what changed,
+    # then frames that redraw the whole window
+    draw_window(board)
+    results.append(BenchmarkResult("draw_window", row_count, time_calls(
+        lambda i: draw_window(board), iterations, max_seconds,
+        prepare=lambda i: board.slide(rng.choice(board.valid_moves())))))
+    results.append(BenchmarkResult("draw_window (full)", row_count, time_calls(
+        lambda i: draw_window(board), iterations, max_seconds, prepare=lambda i: get_renderer().invalidate())))
+    return results
+
+
+def run_benchmarks(sizes: Sequence[int], iterations: int, max_seconds: float,
+                   seed: Optional[int] = None) -> List[BenchmarkResult]:
+    """
+    Parameters
+    ----------
+    `iterations`, `max_seconds`:
+        Every benchmark makes `iterations` calls per size, or fewer if they take `max_seconds` in total.
+    """
+    init_window()
+    rng = random.Random(seed)
+    results = []
+    for row_count in sizes:
+        results += benchmark_size(row_count, iterations, max_seconds, rng)
+    return results
+
+
+def format_table(results: Sequence[BenchmarkResult]) -> str:
+    rows = [result.fields() for result in results]
+    columns = list(rows[0])
+    widths = {column: max(len(column), *(len(row[column]) for row in rows)) for column in columns}
+    lines = ["  ".join(column.rjust(widths[column]) if i else column.ljust(widths[column])
+                       for i, column in enumerate(columns))]
+    for row in rows:
+        lines.append("  ".join(row[column].rjust(widths[column]) if i else row[column].ljust(widths[column])
+                               for i, column in enumerate(columns)))
+    return "\n".join(lines)
+
+
+def write_csv(results: Sequence[BenchmarkResult], path: str) -> None:
+    rows = [result.fields() for result in results]
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        # Plain numbers, without the thousands separators of the table
+        writer.writerows({column: value.replace(",", "") for column, value in row.items()} for row in rows)
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of the game without a window.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help=f"row counts of the boards (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument("--iterations", type=int, default=1000, help="calls per benchmark and size (default: 1000)")
+    parser.add_argument("--max-seconds", type=float, default=2.0,
+                        help="stop a benchmark early once its calls took this long (default: 2)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the boards and clicks")
+    parser.add_argument("--csv", help="also write the results to this CSV file")
+    args = parser.parse_args(argv)
+    if min(args.sizes) < 2:
+        parser.error("sizes must be at least 2")
+
+    results = run_benchmarks(args.sizes, args.iterations, args.max_seconds, args.seed)
+    print(format_table(results))
+    if args.csv:
+        write_csv(results, args.csv)
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,231 @@
+"""
+A corpus of boards graded by their optimal solution length.
+
+Boards are generated in seeded chunks, solved optimally across a process pool and appended to one
+file per solution length. Each file holds fixed-size records (one byte per square), so picking a
+board of a given difficulty is a single seek and read. `corpus.json` records the parameters and
+how many boards of every length are done, so an interrupted build resumes where it stopped and a
+build with a larger count extends the corpus:
+    python corpus.py corpus-3x3 --size 3 --count 100000
+    python corpus.py corpus-4x4 --size 4 --count 1000 --scramble-depth 60 --workers 8
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
+
+from engine import Board
+from engine.batch_generation import generate_solvable_boards
+from pattern_database import DEFAULT_PARTITIONS, load_database
+from solver import Heuristic, get_default_heuristic, solve
+
+FORMAT_VERSION = 1
+META_FILE_NAME = "corpus.json"
+
+DIFFICULTY_LENGTHS: Dict[int, Dict[str, Tuple[int, int]]] = {
+    3: {"easy": (0, 14), "medium": (15, 22), "hard": (23, 31)},
+    4: {"easy": (0, 35), "medium": (36, 50), "hard": (51, 80)},
+}
+"""Inclusive ranges of optimal solution lengths for every difficulty, per row count."""
+
+
+def get_bucket_path(path: str, length: int) -> str:
+    return os.path.join(path, f"length-{length:03d}.bin")
+
+
+def _get_bucket_lengths(path: str) -> List[int]:
+    """The solution lengths of the bucket files in `path`."""
+    return sorted(int(name[len("length-"):-len(".bin")]) for name in os.listdir(path)
+                  if name.startswith("length-") and name.endswith(".bin"))
+
+
+class Corpus:
+    """Read access to a corpus directory built by `build_corpus`."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Raises
+        ------
+        ValueError
+            If `path` does not hold a corpus of the current format version
+        """
+        self.path = path
+        with open(os.path.join(path, META_FILE_NAME)) as file:
+            meta = json.load(file)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} corpus")
+        self.row_count: int = meta["row_count"]
+        self.record_size = self.row_count * self.row_count
+
+    def lengths(self) -> List[int]:
+        """The solution lengths that have boards, in increasing order."""
+        return [length for length in _get_bucket_lengths(self.path) if self.count(length)]
+
+    def count(self, length: int) -> int:
+        """The number of boards with an optimal solution of `length` moves."""
+        try:
+            return os.path.getsize(get_bucket_path(self.path, length)) // self.record_size
+        except FileNotFoundError:
+            return 0
+
+    def read(self, length: int, index: int) -> Board:
+        """
+        Raises
+        ------
+        IndexError
+            If there are not more than `index` boards of that solution length
+        """
+        if not 0 <= index < self.count(length):
+            raise IndexError(f"no board {index} with a {length} move solution")
+        with open(get_bucket_path(self.path, length), "rb") as file:
+            file.seek(index * self.record_size)
+            return Board.from_list(list(file.read(self.record_size)))
+
+    def pick(self, difficulty: str, rng: Optional[random.Random] = None) -> Board:
+        """
+        A random board whose optimal solution length is in the range of `difficulty`
+        (see `DIFFICULTY_LENGTHS`), every board in the range being equally likely.
+
+        Raises
+        ------
+        LookupError
+            If the corpus has no board of that difficulty
+        """
+        rng = rng or random.Random()
+        low, high = DIFFICULTY_LENGTHS[self.row_count][difficulty]
+        counts = [(length, self.count(length)) for length in range(low, high + 1)]
+        total = sum(count for _, count in counts)
+        if total == 0:
+            raise LookupError(f"{self.path} has no {difficulty} boards")
+        index = rng.randrange(total)
+        for length, count in counts:
+            if index < count:
+                return self.read(length, index)
+            index -= count
+        raise AssertionError("unreachable")
+
+
+_worker_heuristic: Optional[Heuristic] = None
+
+
+def _init_worker(row_count: int) -> None:
+    global _worker_heuristic
+    # The pattern database is memory-mapped, so every worker shares the same pages
+    _worker_heuristic = get_default_heuristic(row_count)
+
+
+def _solve_length(board: bytes) -> int:
+    return len(solve(list(board), _worker_heuristic).moves)
+
+
+def _write_meta(path: str, meta: dict) -> None:
+    tmp_path = os.path.join(path, f"{META_FILE_NAME}.tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(meta, file, indent=2)
+    os.replace(tmp_path, os.path.join(path, META_FILE_NAME))
+
+
+def build_corpus(path: str, row_count: int, board_count: int, seed: int = 0, chunk_size: int = 1000,
+                 scramble_depth: Optional[int] = None, workers: Optional[int] = None,
+                 log: Optional[TextIO] = sys.stderr) -> Corpus:
+    """
+    Generate `board_count` boards, solve them optimally and add them to the corpus at `path`,
+    resuming an interrupted build with the same parameters (or extending it if `board_count` is larger).
+
+    Parameters
+    ----------
+    `seed`, `chunk_size`, `scramble_depth`:
+        Boards of chunk `i` are `generate_solvable_boards(chunk_size, row_count, (seed, i), scramble_depth)`,
+        so the first `board_count` boards are the same whatever `board_count` is.
+
+    `workers`:
+        The number of solver processes (all CPUs by default).
+
+    `log`:
+        Where progress is reported, None to stay silent.
+
+    Raises
+    ------
+    ValueError
+        If `path` holds a corpus built with other parameters
+    """
+    if row_count * row_count > 256:
+        raise ValueError(f"boards of {row_count}x{row_count} do not fit one byte per square")
+    os.makedirs(path, exist_ok=True)
+    params = {"format_version": FORMAT_VERSION, "row_count": row_count, "seed": seed,
+              "chunk_size": chunk_size, "scramble_depth": scramble_depth}
+    meta = {**params, "counts": {}}
+    meta_path = os.path.join(path, META_FILE_NAME)
+    if os.path.exists(meta_path):
+        with open(meta_path) as file:
+            meta = json.load(file)
+        if {key: meta.get(key) for key in params} != params:
+            raise ValueError(f"{path} was built with other parameters: {meta}")
+        # Drop the records appended after the last recorded chunk
+        for length in _get_bucket_lengths(path):
+            with open(get_bucket_path(path, length), "r+b") as bucket:
+                bucket.truncate(meta["counts"].get(str(length), 0) * row_count * row_count)
+    else:
+        _write_meta(path, meta)
+
+    boards_done = sum(meta["counts"].values())
+    if boards_done >= board_count:
+        return Corpus(path)
+    if row_count in DEFAULT_PARTITIONS:
+        # Build the pattern database once before the workers map it
+        load_database(row_count)
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    solved = 0
+    with multiprocessing.Pool(workers, _init_worker, (row_count,)) as pool:
+        while boards_done < board_count:
+            # A build with a smaller count may have stopped in the middle of a chunk, finish it first
+            chunk_index, offset = divmod(boards_done, chunk_size)
+            size = min(chunk_size, board_count - chunk_index * chunk_size)
+            boards = [bytes(board) for board in generate_solvable_boards(
+                chunk_size, row_count, (seed, chunk_index), scramble_depth)[offset:size]]
+            lengths = pool.map(_solve_length, boards, chunksize=max(1, len(boards) // (4 * workers)))
+
+            buckets: Dict[int, List[bytes]] = {}
+            for board, length in zip(boards, lengths):
+                buckets.setdefault(length, []).append(board)
+            for length, records in buckets.items():
+                with open(get_bucket_path(path, length), "ab") as bucket:
+                    bucket.write(b"".join(records))
+                meta["counts"][str(length)] = meta["counts"].get(str(length), 0) + len(records)
+            _write_meta(path, meta)
+
+            boards_done += len(boards)
+            solved += len(boards)
+            if log is not None:
+                elapsed = time.perf_counter() - start
+                print(f"{boards_done}/{board_count} boards: {solved / elapsed:,.1f} boards/s, "
+                      f"~{(board_count - boards_done) * elapsed / solved:,.0f} s left", file=log, flush=True)
+    return Corpus(path)
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build a corpus of boards graded by optimal solution length.")
+    parser.add_argument("path", help="corpus directory (resumed if it exists)")
+    parser.add_argument("--size", type=int, default=3, help="row count of the boards (default: 3)")
+    parser.add_argument("--count", type=int, default=10000, help="number of boards (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the boards (default: 0)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="boards per resumable chunk (default: 1000)")
+    parser.add_argument("--scramble-depth", type=int, default=None,
+                        help="make boards with this many random moves instead of uniformly at random")
+    parser.add_argument("--workers", type=int, default=None, help="number of solver processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.path, args.size, args.count, args.seed, args.chunk_size, args.scramble_depth,
+                          args.workers)
+    for length in corpus.lengths():
+        print(f"{length:3d} moves: {corpus.count(length)}")
+
+
+if __name__ == "__main__":
+    _main()
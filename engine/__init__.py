@@ -0,0 +1,11 @@
+"""
+The game logic of the slide puzzle without any display: boards, moves, generation and win detection.
+
+Importing the engine does not import pygame (or NumPy), so it can be used in worker processes,
+tests and servers.
+"""
+from engine.board import (ArrayBoard, Board, PackedBoard, get_neighbour_table, get_row_count, is_perfect_square,
+                          is_solvable, is_solved)
+from engine.generation import generate_solvable_board
+from engine.moves import get_partition, get_valid_moves, slide_square_at
+
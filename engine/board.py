@@ -0,0 +1,282 @@
+"""
+Compact board state for play and search, and the rules of a solved / solvable board.
+
+`Board.from_list` takes the flat list format used by `SlidePuzzle.py` (0 is the empty square)
+and returns a `PackedBoard` (4 bits per square in one integer) for boards of up to 4x4, or an
+`ArrayBoard` for larger ones. Both keep the empty square's index up to date, so sliding a square
+is O(1) and never scans the board.
+"""
+import math
+import random
+from abc import ABC, abstractmethod
+from array import array
+from typing import Dict, Hashable, Iterator, List, Sequence, Tuple
+
+# Boards with at most this many squares fit in a 64-bit integer at 4 bits per square
+MAX_PACKED_LENGTH = 16
+
+_neighbour_tables: Dict[int, Tuple[Tuple[int, ...], ...]] = {}
+_zobrist_tables: Dict[int, Tuple[Tuple[int, ...], ...]] = {}
+_solved_packed: Dict[int, int] = {}
+
+
+def get_neighbour_table(row_count: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Parameters
+    ----------
+    `row_count`:
+        The number of rows (and columns) of the board.
+
+    Returns
+    -------
+    A tuple where item `i` holds the indices of the squares that are orthogonally adjacent to square `i`.
+    The table is computed once per board size.
+    """
+    table = _neighbour_tables.get(row_count)
+    if table is None:
+        neighbours = []
+        for index in range(row_count * row_count):
+            row, column = divmod(index, row_count)
+            adjacent = []
+            if column > 0:
+                adjacent.append(index - 1)
+            if column < row_count - 1:
+                adjacent.append(index + 1)
+            if row > 0:
+                adjacent.append(index - row_count)
+            if row < row_count - 1:
+                adjacent.append(index + row_count)
+            neighbours.append(tuple(adjacent))
+        table = _neighbour_tables[row_count] = tuple(neighbours)
+    return table
+
+
+def _get_zobrist_table(row_count: int) -> Tuple[Tuple[int, ...], ...]:
+    """Random 64-bit keys for every (square number, index) pair, seeded by the board size."""
+    table = _zobrist_tables.get(row_count)
+    if table is None:
+        board_length = row_count * row_count
+        rng = random.Random(row_count)
+        table = _zobrist_tables[row_count] = tuple(
+            tuple(rng.getrandbits(64) if sq_num else 0 for _ in range(board_length))
+            for sq_num in range(board_length))
+    return table
+
+
+def is_perfect_square(num: int) -> bool:
+    return num == math.isqrt(num) ** 2
+
+
+def get_row_count(board_length: int) -> int:
+    """
+    Raises
+    ------
+    ValueError
+        If `board_length` is not a perfect square of at least 4
+    """
+    if not is_perfect_square(board_length) or board_length < 4:
+        raise ValueError(f"The number of squares in the board ({board_length}) must be a perfect square")
+    return math.isqrt(board_length)
+
+
+def is_solvable(board: Sequence[int]) -> bool:
+    """
+    Check the permutation parity of `board` against the solved board.
+
+    For an odd row count the number of inversions must be even. For an even row count
+    the number of inversions plus the row of the empty square (counted from the bottom) must be odd.
+    """
+    row_count = get_row_count(len(board))
+    tiles = [sq_num for sq_num in board if sq_num != 0]
+    inversions = 0
+    for i, tile in enumerate(tiles):
+        for other in tiles[i + 1:]:
+            if other < tile:
+                inversions += 1
+    if row_count % 2 == 1:
+        return inversions % 2 == 0
+    empty_row_from_bottom = row_count - list(board).index(0) // row_count
+    return (inversions + empty_row_from_bottom) % 2 == 1
+
+
+def is_solved(board: "Board") -> bool:
+    """Whether the player has won, i.e. every square is in order and the empty square is last."""
+    return board.is_solved()
+
+
+class Board(ABC):
+    """
+    A board of `row_count` x `row_count` squares with the empty square at index `empty`.
+
+    Boards are mutable (`slide`) but hash and compare by their squares, so a copy can be
+    used as a transposition table key. Indexing works like a list, negative indices included.
+    """
+    __slots__ = ("row_count", "empty", "neighbours")
+
+    def __init__(self, row_count: int, empty: int) -> None:
+        self.row_count = row_count
+        self.empty = empty
+        self.neighbours = get_neighbour_table(row_count)
+
+    @staticmethod
+    def from_list(squares: Sequence[int]) -> "Board":
+        """
+        Raises
+        ------
+        ValueError
+            If `squares` is not a permutation of 0..n-1 with n a perfect square
+        """
+        row_count = get_row_count(len(squares))
+        if sorted(squares) != list(range(len(squares))):
+            raise ValueError("board must be a permutation of the numbers 0 to n - 1")
+        if len(squares) <= MAX_PACKED_LENGTH:
+            return PackedBoard(row_count, squares)
+        return ArrayBoard(row_count, squares)
+
+    @staticmethod
+    def solved(row_count: int) -> "Board":
+        return Board.from_list(list(range(1, row_count * row_count)) + [0])
+
+    @property
+    @abstractmethod
+    def key(self) -> Hashable:
+        """A compact value that identifies the squares exactly, for use as a cache key."""
+
+    def valid_moves(self) -> Tuple[int, ...]:
+        """The indices of the squares that can slide into the empty square."""
+        return self.neighbours[self.empty]
+
+    def can_slide(self, pos: int) -> bool:
+        return pos in self.neighbours[self.empty]
+
+    @abstractmethod
+    def slide(self, pos: int) -> None:
+        """Slide the square at `pos` into the empty square. `pos` must be in `valid_moves()`."""
+
+    @abstractmethod
+    def copy(self) -> "Board":
+        pass
+
+    @abstractmethod
+    def is_solved(self) -> bool:
+        pass
+
+    def to_list(self) -> List[int]:
+        return list(self)
+
+    def __len__(self) -> int:
+        return self.row_count * self.row_count
+
+    @abstractmethod
+    def __getitem__(self, pos: int) -> int:
+        pass
+
+    def __iter__(self) -> Iterator[int]:
+        return (self[pos] for pos in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_list()})"
+
+
+class PackedBoard(Board):
+    """Square `i` is stored in bits 4i..4i+3 of `packed`, which doubles as the hash."""
+    __slots__ = ("packed",)
+
+    def __init__(self, row_count: int, squares: Sequence[int]) -> None:
+        super().__init__(row_count, list(squares).index(0))
+        self.packed = sum(sq_num << (pos << 2) for pos, sq_num in enumerate(squares))
+        if row_count not in _solved_packed:
+            _solved_packed[row_count] = sum(
+                sq_num << ((sq_num - 1) << 2) for sq_num in range(1, row_count * row_count))
+
+    @property
+    def key(self) -> int:
+        return self.packed
+
+    def slide(self, pos: int) -> None:
+        shift = pos << 2
+        packed = self.packed
+        sq_num = (packed >> shift) & 0xF
+        self.packed = (packed ^ (sq_num << shift)) | (sq_num << (self.empty << 2))
+        self.empty = pos
+
+    def copy(self) -> "PackedBoard":
+        board = PackedBoard.__new__(PackedBoard)
+        board.row_count = self.row_count
+        board.empty = self.empty
+        board.neighbours = self.neighbours
+        board.packed = self.packed
+        return board
+
+    def is_solved(self) -> bool:
+        return self.packed == _solved_packed[self.row_count]
+
+    def __getitem__(self, pos: int) -> int:
+        length = self.row_count * self.row_count
+        if pos < 0:
+            pos += length
+        if not 0 <= pos < length:
+            raise IndexError("board index out of range")
+        return (self.packed >> (pos << 2)) & 0xF
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PackedBoard):
+            return self.packed == other.packed and self.row_count == other.row_count
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.packed)
+
+
+class ArrayBoard(Board):
+    """Squares are kept in an `array`, hashed incrementally with Zobrist keys."""
+    __slots__ = ("squares", "zobrist_hash", "_zobrist")
+
+    def __init__(self, row_count: int, squares: Sequence[int]) -> None:
+        self.squares = array("H", squares)
+        super().__init__(row_count, self.squares.index(0))
+        self._zobrist = _get_zobrist_table(row_count)
+        self.zobrist_hash = 0
+        for pos, sq_num in enumerate(self.squares):
+            self.zobrist_hash ^= self._zobrist[sq_num][pos]
+
+    @property
+    def key(self) -> bytes:
+        return self.squares.tobytes()
+
+    def slide(self, pos: int) -> None:
+        squares = self.squares
+        sq_num = squares[pos]
+        squares[self.empty] = sq_num
+        squares[pos] = 0
+        keys = self._zobrist[sq_num]
+        self.zobrist_hash ^= keys[pos] ^ keys[self.empty]
+        self.empty = pos
+
+    def copy(self) -> "ArrayBoard":
+        board = ArrayBoard.__new__(ArrayBoard)
+        board.row_count = self.row_count
+        board.empty = self.empty
+        board.neighbours = self.neighbours
+        board.squares = array("H", self.squares)
+        board.zobrist_hash = self.zobrist_hash
+        board._zobrist = self._zobrist
+        return board
+
+    def is_solved(self) -> bool:
+        squares = self.squares
+        return squares[-1] == 0 and all(squares[pos] == pos + 1 for pos in range(len(squares) - 1))
+
+    def __getitem__(self, pos: int) -> int:
+        return self.squares[pos]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.squares)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ArrayBoard):
+            return self.zobrist_hash == other.zobrist_hash and self.squares == other.squares
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return self.zobrist_hash
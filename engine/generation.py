@@ -0,0 +1,48 @@
+"""
+Shuffled boards for play. See `engine.batch_generation` for generating many boards at once.
+"""
+import math
+import random
+from typing import Optional
+
+from engine.board import Board, is_perfect_square
+
+
+def generate_solvable_board(board_length: int, rng: Optional[random.Random] = None) -> Board:
+    """
+    Parameters
+    ----------
+    `board_length`:
+        The number of elements that the returned board should have (must be a perfect square)
+
+    `rng`:
+        The source of randomness, the `random` module by default. Pass a seeded `random.Random`
+        for reproducible boards.
+
+    Returns
+    -------
+    A solveable board of randomly ordered numbers
+
+    Raises
+    ------
+    ValueError
+        If `board_length` is not a perfect square
+    """
+    # Validate parameter
+    if not is_perfect_square(board_length):
+        raise ValueError(f"`board_length` {board_length} is not a perfect square")
+
+    # Generate a solved board
+    board = Board.solved(math.isqrt(board_length))
+
+    # Perform a random number of valid moves (odd count) to shuffle the board,
+    # more on larger boards so that every part of them gets shuffled
+    rng = rng or random
+    num_moves = rng.randint(20, 100) * max(1, board_length // 9)
+    if num_moves % 2 == 0:
+        num_moves += 1
+
+    for _ in range(num_moves):
+        board.slide(rng.choice(board.valid_moves()))
+
+    return board
@@ -0,0 +1,81 @@
+"""
+Moves on a `Board` and the mapping of screen coordinates to squares.
+"""
+from typing import List, Optional, Tuple
+
+from engine.board import Board
+
+
+def get_valid_moves(board: Board) -> List[Tuple[int, int]]:
+    # The neighbours of every square are precomputed once per board size
+    return [(board.empty, pos) for pos in board.valid_moves()]
+
+
+def get_partition(x: int, min_number: int, max_number: int, partition_count: int) -> int:
+    """
+    Divide the range `min_number`-`max_number` (both ends excluded) to `partition_count` partitions and find in index of the partition that `x` is in
+
+    Parameters
+    ----------
+    `x`:
+        The number to find in which partition it is in.
+
+    `min_number`:
+        The minimum number in the range that x is expected to be in (excluded from the range).
+
+    `max_number`:
+        The max number in the range that x is expected to be in (excluded from the range).
+
+    `partition_count`:
+        The number partitions to divide the range into.
+
+    Returns
+    -------
+    The index of the partition that `x` is in.
+
+    Raises
+    ------
+    ValueError
+        If `x` is not the interval (`min_number`, `max_number`)
+    """
+    if x < min_number or x > max_number:
+        raise ValueError(
+            f"x ({x}) is outside the range ({min_number}, {max_number}).")
+    range_size = max_number - min_number
+    partition_size = range_size / partition_count
+    x_relative = x - min_number
+    partition_index = int(x_relative // partition_size)
+    return partition_index
+
+
+def slide_square_at(square_pos: Tuple[int, int], board: Board, board_left: int, board_top: int,
+                    board_side_length: int) -> Optional[int]:
+    """
+    Parameters
+    ----------
+    `square_pos`:
+        The coordinates of a point in the square to slide.
+
+    `board`:
+        The board to slide the square in. The board will modified if there was a square that slid.
+
+    `board_left`, `board_top`, `board_side_length`:
+        Where `board` is drawn.
+
+    Returns
+    -------
+    The index of the square that slid, None if the square can't slide.
+    """
+    row_count = board.row_count
+    column_index = get_partition(
+        square_pos[0], board_left, board_left + board_side_length, row_count)
+    row_index = get_partition(
+        square_pos[1], board_top, board_top + board_side_length, row_count)
+    # A point on the far edge belongs to the last square, not to one past it
+    sq_index = row_count * min(row_index, row_count - 1) + min(column_index, row_count - 1)
+
+    # Swap the empty square with the square gotten from `square_pos` if they are adjacent
+    if not board.can_slide(sq_index):
+        return None
+    board.slide(sq_index)
+    return sq_index
@@ -0,0 +1,280 @@
+"""
+Fast, non-optimal solver for boards of any size.
+
+The board is reduced one row and one column at a time: the squares of the top row are placed
+left to right, then the squares of the left column top to bottom, after which the rest is a board
+one size smaller. The last two squares of a row (or column) and the final 2x2 board are finished
+with a breadth-first search restricted to a few squares around them. Every square is placed in
+O(N) moves, so a solution takes O(N³) moves and about as much time. Afterwards every stretch of
+moves that keeps the empty square within a few squares is replaced by a shortest one.
+
+    python fast_solver.py --size 30 --seed 1
+"""
+import argparse
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from engine.board import get_neighbour_table, get_row_count, is_solvable
+
+SEARCH_ALL_SQUARE_COUNT = 9
+"""The last two squares of a line are placed by searching all unlocked squares once there are at most this many."""
+
+SHORTEN_SQUARE_COUNT = 6
+"""`remove_redundant_moves` searches for shorter replacements of stretches of moves within this many squares."""
+
+
+class _Reducer:
+    def __init__(self, board: Sequence[int]) -> None:
+        self.board = list(board)
+        self.row_count = get_row_count(len(self.board))
+        self.neighbours = get_neighbour_table(self.row_count)
+        self.rows = [pos // self.row_count for pos in range(len(self.board))]
+        self.columns = [pos % self.row_count for pos in range(len(self.board))]
+        self.empty = self.board.index(0)
+        # position[sq_num] is the index of square `sq_num`
+        self.position = [0] * len(self.board)
+        for pos, sq_num in enumerate(self.board):
+            self.position[sq_num] = pos
+        self.locked = bytearray(len(self.board))
+        self.moves: List[int] = []
+
+    def slide(self, pos: int) -> None:
+        sq_num = self.board[pos]
+        self.board[self.empty] = sq_num
+        self.position[sq_num] = self.empty
+        self.board[pos] = 0
+        self.position[0] = pos
+        self.empty = pos
+        self.moves.append(pos)
+
+    def find_path(self, start: int, target: int, avoid: int = -1) -> Optional[List[int]]:
+        """The indices after `start` on a shortest path to `target` over unlocked squares other than `avoid`."""
+        if start == target:
+            return []
+        locked, neighbours = self.locked, self.neighbours
+        previous = {start: start}
+        queue = deque([start])
+        while queue:
+            pos = queue.popleft()
+            for next_pos in neighbours[pos]:
+                if next_pos in previous or locked[next_pos] or next_pos == avoid:
+                    continue
+                previous[next_pos] = pos
+                if next_pos == target:
+                    path = [target]
+                    while previous[path[-1]] != start:
+                        path.append(previous[path[-1]])
+                    path.reverse()
+                    return path
+                queue.append(next_pos)
+        return None
+
+    def move_empty_to(self, target: int, avoid: int = -1) -> bool:
+        path = self.find_path(self.empty, target, avoid)
+        if path is None:
+            return False
+        for pos in path:
+            self.slide(pos)
+        return True
+
+    def move_square_to(self, sq_num: int, targets: Sequence[int]) -> bool:
+        """Move square `sq_num` to one of `targets`, trying the nearest first."""
+        pos = self.position[sq_num]
+        if pos in targets:
+            return True
+        path = None
+        for target in sorted(targets, key=lambda target: abs(self.rows[target] - self.rows[pos])
+                             + abs(self.columns[target] - self.columns[pos])):
+            # Prefer a path that does not start by swapping with the empty square
+            path = self.find_path(pos, target, self.empty) or self.find_path(pos, target)
+            if path is not None:
+                break
+        if path is None:
+            return False
+        for next_pos in path:
+            # Bring the empty square in front of the square, then slide the square into it
+            if not self.move_empty_to(next_pos, avoid=pos):
+                return False
+            self.slide(pos)
+            pos = next_pos
+        return True
+
+    def solve_region(self, region: Sequence[int], goals: Dict[int, int]) -> bool:
+        """
+        Breadth-first search for moving the squares in `goals` (square number -> index) to their goals
+        while the empty square stays in `region`. The squares and the empty square must be in `region`.
+        """
+        tracked = list(goals)
+        start = (self.empty, *(self.position[sq_num] for sq_num in tracked))
+        goal = tuple(goals[sq_num] for sq_num in tracked)
+        in_region = set(region)
+        previous: Dict[Tuple[int, ...], Tuple[Tuple[int, ...], int]] = {start: (start, -1)}
+        queue = deque([start])
+        while queue:
+            state = queue.popleft()
+            if state[1:] == goal:
+                moves = []
+                while previous[state][1] != -1:
+                    state, pos = previous[state]
+                    moves.append(pos)
+                for pos in reversed(moves):
+                    self.slide(pos)
+                return True
+            empty = state[0]
+            for pos in self.neighbours[empty]:
+                if pos not in in_region:
+                    continue
+                next_state = (pos, *(empty if tracked_pos == pos else tracked_pos for tracked_pos in state[1:]))
+                if next_state not in previous:
+                    previous[next_state] = (state, pos)
+                    queue.append(next_state)
+        return False
+
+    def place_pair(self, first: int, second: int, region: Sequence[int]) -> None:
+        """
+        Place the last two squares of a line (with goals `first` and `second`) using `region`,
+        a 3x2 (or 2x3) block of unlocked squares holding both goals.
+        """
+        first_sq_num, second_sq_num = first + 1, second + 1
+        goals = {first_sq_num: first, second_sq_num: second}
+        if self.position[first_sq_num] == first and self.position[second_sq_num] == second:
+            self.locked[first] = self.locked[second] = 1
+            return
+        if self.locked.count(0) <= SEARCH_ALL_SQUARE_COUNT:
+            # On the last 3x3 board the two squares can wall the empty square off, but all of it can be searched
+            if not self.solve_region([pos for pos in range(len(self.board)) if not self.locked[pos]], goals):
+                raise RuntimeError(f"squares {first_sq_num} and {second_sq_num} can't be placed")
+        else:
+            # Gather both squares and the empty square in the region, then finish with a search.
+            # The first square goes to the end of the line, where it cannot trap the empty square outside the region.
+            if not self.move_square_to(first_sq_num, (second,)):
+                raise RuntimeError(f"square {first_sq_num} can't reach {second}")
+            self.locked[second] = 1
+            if not self.move_square_to(second_sq_num, region):
+                raise RuntimeError(f"square {second_sq_num} can't reach {region}")
+            self.locked[self.position[second_sq_num]] = 1
+            targets = [pos for pos in region if not self.locked[pos]]
+            if self.empty not in targets and not any(self.move_empty_to(pos) for pos in targets):
+                raise RuntimeError(f"the empty square can't reach {region}")
+            self.locked[second] = self.locked[self.position[second_sq_num]] = 0
+            if not self.solve_region(region, goals):
+                raise RuntimeError(f"squares {first_sq_num} and {second_sq_num} can't be placed in {region}")
+        self.locked[first] = self.locked[second] = 1
+
+    def place(self, goal: int) -> None:
+        if not self.move_square_to(goal + 1, (goal,)):
+            raise RuntimeError(f"square {goal + 1} can't reach its goal")
+        self.locked[goal] = 1
+
+    def solve(self) -> List[int]:
+        n = self.row_count
+        for k in range(n - 2):
+            # Row k, from column k to the right
+            for column in range(k, n - 2):
+                self.place(k * n + column)
+            self.place_pair(k * n + n - 2, k * n + n - 1,
+                            [row * n + column for row in range(k, k + 3) for column in (n - 2, n - 1)])
+            # Column k, from row k + 1 down
+            for row in range(k + 1, n - 2):
+                self.place(row * n + k)
+            self.place_pair((n - 2) * n + k, (n - 1) * n + k,
+                            [row * n + column for row in (n - 2, n - 1) for column in range(k, k + 3)])
+        # What is left is a 2x2 board
+        corner = [row * n + column for row in (n - 2, n - 1) for column in (n - 2, n - 1)]
+        if not self.solve_region(corner, {pos + 1: pos for pos in corner[:3]}):
+            raise RuntimeError("the last 2x2 squares can't be solved")
+        return self.moves
+
+
+def remove_redundant_moves(board: Sequence[int], moves: Sequence[int]) -> List[int]:
+    """
+    Split `moves` into stretches that keep the empty square within `SHORTEN_SQUARE_COUNT` squares and
+    replace each of them by a shortest sequence of moves within those squares that ends the same way.
+
+    Parameters
+    ----------
+    `board`:
+        The board before the first move, it is not modified.
+
+    `moves`:
+        Indices of the squares to slide, in order.
+
+    Returns
+    -------
+    Moves that lead to the same board as `moves`, never more of them.
+    """
+    reducer = _Reducer(board)
+    start = 0
+    while start < len(moves):
+        region = {reducer.empty}
+        end = start
+        while end < len(moves) and (moves[end] in region or len(region) < SHORTEN_SQUARE_COUNT):
+            region.add(moves[end])
+            end += 1
+        # Where the squares of the region are after the stretch, the squares around it do not move
+        squares = {pos: reducer.board[pos] for pos in region}
+        empty = reducer.empty
+        for pos in moves[start:end]:
+            squares[empty] = squares[pos]
+            squares[pos] = 0
+            empty = pos
+        goals = {sq_num: pos for pos, sq_num in squares.items() if sq_num}
+        # Every move takes one square one step, so a stretch as long as the distance
+        # its squares travel is already shortest
+        distance = sum(abs(reducer.rows[goal] - reducer.rows[reducer.position[sq_num]])
+                       + abs(reducer.columns[goal] - reducer.columns[reducer.position[sq_num]])
+                       for sq_num, goal in goals.items())
+        if end - start == distance:
+            for pos in moves[start:end]:
+                reducer.slide(pos)
+        else:
+            reducer.solve_region(list(region), goals)
+        start = end
+    return reducer.moves
+
+
+def solve_fast(board: Sequence[int]) -> List[int]:
+    """
+    Parameters
+    ----------
+    `board`:
+        The board to solve, a `Board` or the flat list format used by `draw_window`. It is not modified.
+
+    Returns
+    -------
+    The indices of the squares to slide, in order. The solution is not the shortest.
+
+    Raises
+    ------
+    ValueError
+        If `board` is not a permutation of 0..n-1 with n a perfect square, or it cannot be solved
+    """
+    board = list(board)
+    if sorted(board) != list(range(len(board))):
+        raise ValueError("board must be a permutation of the numbers 0 to n - 1")
+    if not is_solvable(board):
+        raise ValueError("board is not solvable")
+    return remove_redundant_moves(board, _Reducer(board).solve())
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> None:
+    from solver import random_solvable_board
+
+    parser = argparse.ArgumentParser(description="Solve large boards quickly (not optimally).")
+    parser.add_argument("--size", type=int, default=30, help="row count of the random board (default: 30)")
+    parser.add_argument("--count", type=int, default=1, help="number of random boards to solve (default: 1)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random boards")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    for _ in range(args.count):
+        board = random_solvable_board(args.size, rng)
+        start = time.perf_counter()
+        moves = solve_fast(board)
+        print(f"{args.size}x{args.size}: {len(moves)} moves in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    _main()
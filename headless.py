@@ -0,0 +1,93 @@
+"""
+Replay scripted clicks through `handle_square_sliding` without opening a window.
+
+A script is a text file with one click per line, `x y` in window coordinates (blank lines and
+lines starting with # are ignored). Clicks are applied at full speed:
+    python headless.py --board 8 6 7 2 5 4 3 0 1 --script clicks.txt
+    python headless.py --size 4 --random-clicks 100000 --seed 1
+"""
+import argparse
+import os
+import random
+import time
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from engine import Board, generate_solvable_board, is_solved
+from SlidePuzzle import (MAIN_BOARD_LEFT, MAIN_BOARD_SIDE_LENGTH, MAIN_BOARD_TOP, TEMP_BOARD_LENGTH,
+                         get_board_rect, handle_square_sliding)
+
+
+class ReplayResult(NamedTuple):
+    board: Board
+    clicks: int
+    slides: int
+    solved: bool
+    seconds: float
+
+    def report(self) -> str:
+        clicks_per_second = self.clicks / self.seconds if self.seconds > 0 else float("inf")
+        return (f"{self.clicks} clicks, {self.slides} slides in {self.seconds * 1000:.2f} ms "
+                f"({clicks_per_second:,.0f} clicks/s), solved: {self.solved}")
+
+
+def read_script(path: str) -> List[Tuple[int, int]]:
+    clicks = []
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                x, y = line.split()
+                clicks.append((int(x), int(y)))
+    return clicks
+
+
+def random_clicks(count: int, rng: random.Random) -> List[Tuple[int, int]]:
+    """Random clicks inside the main board."""
+    return [(rng.randint(MAIN_BOARD_LEFT, MAIN_BOARD_LEFT + MAIN_BOARD_SIDE_LENGTH - 1),
+             rng.randint(MAIN_BOARD_TOP, MAIN_BOARD_TOP + MAIN_BOARD_SIDE_LENGTH - 1)) for _ in range(count)]
+
+
+def replay(board: Board, clicks: Iterable[Tuple[int, int]], stop_when_solved: bool = False) -> ReplayResult:
+    """
+    Apply `clicks` to `board` like the main loop does. Clicks outside its squares are ignored.
+    """
+    click_count = 0
+    slides = 0
+    start = time.perf_counter()
+    for mouse_pos in clicks:
+        click_count += 1
+        if get_board_rect(board.row_count).collidepoint(mouse_pos):
+            if handle_square_sliding(mouse_pos, board) is not None:
+                slides += 1
+                if stop_when_solved and is_solved(board):
+                    break
+    return ReplayResult(board, click_count, slides, is_solved(board), time.perf_counter() - start)
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay clicks on a board without a window.")
+    parser.add_argument("--board", nargs="+", type=int, help="starting board as a flat list, 0 is the empty square")
+    parser.add_argument("--size", type=int, default=None, help="row count of a random starting board")
+    parser.add_argument("--script", help="file with one `x y` click per line")
+    parser.add_argument("--random-clicks", type=int, default=0, help="number of random clicks on the board")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random board and clicks")
+    parser.add_argument("--stop-when-solved", action="store_true", help="stop at the first click that solves the board")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    if args.board:
+        board = Board.from_list(args.board)
+    else:
+        board = generate_solvable_board(args.size ** 2 if args.size else TEMP_BOARD_LENGTH, rng)
+    clicks = read_script(args.script) if args.script else []
+    clicks += random_clicks(args.random_clicks, rng)
+
+    result = replay(board, clicks, args.stop_when_solved)
+    print(result.report())
+    print(result.board.to_list())
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,160 @@
+"""
+Next-move hints for the board being played.
+
+`HintService.hint` returns the index of the square to slide next on an optimal solution.
+Every position of a solution found is remembered, so following the hints never searches again,
+and solved positions are kept in a bounded LRU cache keyed by `Board.key`. After the player
+deviates, the distances of the neighbouring positions bound the new distance (a move changes it
+by exactly one), so the search is seeded with those bounds instead of starting cold.
+
+The game loop calls `HintService.poll_hint`, which runs the searches in a background thread.
+"""
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from engine import Board
+from pattern_database import is_database_available, load_heuristic
+from scheduler import run_in_background
+from solver import Heuristic, SolveResult, solve, solve_bounded
+
+DEFAULT_CACHE_SIZE = 100_000
+
+
+class HintService:
+    def __init__(self, row_count: int, heuristic: Optional[Heuristic] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        """
+        Parameters
+        ----------
+        `heuristic`:
+            Heuristic of the searches, by default the pattern database of the board size (the 3x3 one
+            is built here if needed, larger ones must be cached).
+
+        `cache_size`:
+            The most positions kept in the LRU cache.
+
+        Raises
+        ------
+        FileNotFoundError
+            If no `heuristic` is given and the pattern database is not available (see
+            `pattern_database.is_database_available`), searching without one would stall the game
+        """
+        if heuristic is None:
+            if not is_database_available(row_count):
+                raise FileNotFoundError(f"No pattern database for {row_count}x{row_count} boards, "
+                                        f"build it with: python pattern_database.py --size {row_count}")
+            heuristic = load_heuristic(row_count)
+        self.heuristic = heuristic
+        self.cache_size = cache_size
+        # Board key -> (index of the square to slide, moves left to the solution)
+        self.cache: "OrderedDict[Hashable, Tuple[int, int]]" = OrderedDict()
+        # The positions of the last solution found, kept apart so the LRU cache cannot evict them
+        self.remaining_path: Dict[Hashable, Tuple[int, int]] = {}
+        self.searches = 0
+        # The search running in the background for `poll_hint`: the board, its upper bound and the result
+        self.pending: Optional[Tuple[Board, Optional[Tuple[int, int]], "Future[Optional[SolveResult]]"]] = None
+
+    def _remember(self, key: Hashable, move: int, distance: int) -> None:
+        self.cache[key] = (move, distance)
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _remember_path(self, board: Board, moves: List[int]) -> None:
+        position = board.copy()
+        self.remaining_path = {}
+        for i, move in enumerate(moves):
+            entry = (move, len(moves) - i)
+            self.remaining_path[position.key] = entry
+            self._remember(position.key, *entry)
+            position.slide(move)
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[int, int]]:
+        entry = self.remaining_path.get(key)
+        if entry is None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.move_to_end(key)
+        return entry
+
+    def _known_hint(self, board: Board) -> Tuple[Optional[int], int, Optional[Tuple[int, int]]]:
+        """
+        The hint for the unsolved `board` if it is known without a search. Otherwise None with the bounds
+        of the search: a lower bound of the distance and the (distance, move) through the best known neighbour.
+        """
+        entry = self._lookup(board.key)
+        if entry is not None:
+            return entry[0], 0, None
+
+        # Distances of the cached neighbouring positions bound the distance of this one
+        lower_bound = 0
+        upper_bound: Optional[Tuple[int, int]] = None
+        for pos in board.valid_moves():
+            neighbour = board.copy()
+            neighbour.slide(pos)
+            if neighbour.is_solved():
+                self._remember(board.key, pos, 1)
+                return pos, 0, None
+            neighbour_entry = self._lookup(neighbour.key)
+            if neighbour_entry is None:
+                continue
+            neighbour_distance = neighbour_entry[1]
+            lower_bound = max(lower_bound, neighbour_distance - 1)
+            if upper_bound is None or neighbour_distance + 1 < upper_bound[0]:
+                upper_bound = (neighbour_distance + 1, pos)
+        return None, lower_bound, upper_bound
+
+    def _search(self, board: Board, lower_bound: int, upper_bound: Optional[Tuple[int, int]]) -> Optional[SolveResult]:
+        """A shortest solution of `board`, None if none is shorter than going through the best known neighbour."""
+        if upper_bound is None:
+            return solve(board, self.heuristic, lower_bound)
+        return solve_bounded(board, self.heuristic, lower_bound, upper_bound[0] - 1)
+
+    def _finish_search(self, board: Board, upper_bound: Optional[Tuple[int, int]],
+                       result: Optional[SolveResult]) -> int:
+        """Remember the result of `_search` and return the hint it gives."""
+        if result is None:
+            assert upper_bound is not None
+            distance, move = upper_bound
+            self._remember(board.key, move, distance)
+            return move
+        self._remember_path(board, result.moves)
+        return result.moves[0]
+
+    def hint(self, board: Board) -> Optional[int]:
+        """
+        Returns
+        -------
+        The index of the square to slide next to solve `board` in the fewest moves, None if it is solved.
+        """
+        if board.is_solved():
+            return None
+        move, lower_bound, upper_bound = self._known_hint(board)
+        if move is not None:
+            return move
+        self.searches += 1
+        return self._finish_search(board, upper_bound, self._search(board, lower_bound, upper_bound))
+
+    def poll_hint(self, board: Board) -> Optional[int]:
+        """
+        Like `hint`, but never searches on the calling thread, so it can be called every frame.
+        A board that needs a search is searched in a background thread (one at a time) and
+        None is returned until the search is done.
+        """
+        if self.pending is not None:
+            searched, upper_bound, result = self.pending
+            if not result.done():
+                return None
+            self.pending = None
+            self._finish_search(searched, upper_bound, result.result())
+        if board.is_solved():
+            return None
+        move, lower_bound, upper_bound = self._known_hint(board)
+        if move is not None:
+            return move
+        self.searches += 1
+        searched = board.copy()
+        self.pending = (searched, upper_bound,
+                        run_in_background(lambda: self._search(searched, lower_bound, upper_bound)))
+        return None
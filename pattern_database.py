@@ -0,0 +1,377 @@
+"""
+Disjoint additive pattern databases for the slide puzzle.
+
+Every group of tiles gets a table holding, for each placement of its tiles, the least number
+of moves *of those tiles* needed to bring them home. The tables are filled by a breadth-first
+search backwards from the solved board; moves of the other tiles are free, so the values of
+disjoint groups can be added up and stay admissible. Placements are indexed by their rank among
+the n! / (n - k)! placements of k tiles on n squares, so a table has one byte per placement.
+
+Tables are stored in a versioned binary file and loaded with `mmap`, so they are built once
+and several solver processes share the same pages:
+    python pattern_database.py --size 4
+"""
+import argparse
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import insort
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from engine.board import get_neighbour_table
+from solver import Heuristic
+
+FILE_MAGIC = b"SPPDB"
+FORMAT_VERSION = 2
+# magic, format version, row count, group count
+_HEADER = struct.Struct("<5sHBB")
+
+# The table entry of placements that can never happen (two tiles on one square)
+_UNREACHED = 0xFF
+
+DEFAULT_PARTITIONS: Dict[int, Tuple[Tuple[int, ...], ...]] = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)),
+    5: ((1, 2, 6, 7), (3, 4, 8, 9), (5, 10, 15, 20), (11, 12, 16, 17), (13, 14, 18, 19), (21, 22, 23, 24)),
+}
+"""
+Tile groups used when none are given. A table takes n! / (n - k)! bytes for k tiles on n squares
+and the search marks n times as many states, so the 6-6-3 partition of 4x4 (`--groups
+1,2,3,5,6,7/9,10,11,13,14,15/4,8,12`) takes ~550 MB and several minutes to build; 5-5-5 takes about a minute.
+"""
+
+ON_DEMAND_MAX_ROW_COUNT = 3
+"""Databases of boards up to this size build in well under a second, so they are built when first needed."""
+
+
+def get_placement_count(cells: int, group_size: int) -> int:
+    """The number of ways to place `group_size` distinct tiles on `cells` squares."""
+    return math.perm(cells, group_size)
+
+
+def _get_rank_weights(cells: int, group_size: int) -> List[int]:
+    """The weight of every digit of a placement rank (the digits have the radices cells, cells - 1, ...)."""
+    return [math.perm(cells - 1 - i, group_size - 1 - i) for i in range(group_size)]
+
+
+def _rank(positions: Sequence[int], weights: Sequence[int]) -> int:
+    """
+    The index of a placement among all placements in lexicographic order: digit i is the position of
+    tile i counted over the squares not taken by tiles 0..i-1.
+    """
+    rank = 0
+    for i, pos in enumerate(positions):
+        digit = pos
+        for previous in positions[:i]:
+            if previous < pos:
+                digit -= 1
+        rank += digit * weights[i]
+    return rank
+
+
+def _unrank(rank: int, weights: Sequence[int]) -> List[int]:
+    """The positions of the placement with index `rank` (the inverse of `_rank`)."""
+    positions: List[int] = []
+    taken: List[int] = []
+    for weight in weights:
+        pos, rank = divmod(rank, weight)
+        # Skip the squares taken by the previous tiles
+        for previous in taken:
+            if previous <= pos:
+                pos += 1
+        positions.append(pos)
+        insort(taken, pos)
+    return positions
+
+
+def _build_table(row_count: int, tiles: Sequence[int]) -> bytearray:
+    """
+    Breadth-first search from the solved board over (placement of `tiles`, empty square).
+
+    A state is indexed by `rank * cells + empty`. Moving another tile into the empty square costs
+    nothing, so the search is a 0-1 BFS: every state taken from the frontier settles all the squares
+    its empty square reaches for free, and the moves of the group's tiles from there make the next frontier.
+    """
+    cells = row_count * row_count
+    neighbours = get_neighbour_table(row_count)
+    weights = _get_rank_weights(cells, len(tiles))
+    table = bytearray([_UNREACHED]) * get_placement_count(cells, len(tiles))
+    settled = bytearray(len(table) * cells)
+
+    frontier = [_rank([tile - 1 for tile in tiles], weights) * cells + cells - 1]
+    cost = 0
+    while frontier:
+        next_frontier = []
+        for state in frontier:
+            if settled[state]:
+                continue
+            rank, empty = divmod(state, cells)
+            if table[rank] == _UNREACHED:
+                table[rank] = cost
+            positions = _unrank(rank, weights)
+            base = rank * cells
+            settled[state] = 1
+            stack = [empty]
+            while stack:
+                empty = stack.pop()
+                for pos in neighbours[empty]:
+                    if pos not in positions:
+                        if not settled[base + pos]:
+                            settled[base + pos] = 1
+                            stack.append(pos)
+                        continue
+                    # One of the group's tiles slides into the empty square. Only the group's tiles
+                    # that it passes change how many squares the rank digits skip.
+                    order = positions.index(pos)
+                    next_rank = rank
+                    digit_change = empty - pos
+                    step = 1 if empty > pos else -1
+                    for other_order, other_pos in enumerate(positions):
+                        if min(pos, empty) < other_pos < max(pos, empty):
+                            if other_order < order:
+                                digit_change -= step
+                            else:
+                                next_rank += step * weights[other_order]
+                    next_state = (next_rank + digit_change * weights[order]) * cells + pos
+                    if not settled[next_state]:
+                        next_frontier.append(next_state)
+        frontier = next_frontier
+        cost += 1
+    return table
+
+
+class PatternDatabase:
+    """
+    The tables of a disjoint partition of the tiles of one board size.
+
+    `tables[i]` supports indexing by placement index and is either a `bytearray` (freshly built)
+    or a read-only `memoryview` into a memory-mapped file.
+    """
+
+    def __init__(self, row_count: int, groups: Sequence[Sequence[int]], tables: Sequence[Sequence[int]],
+                 mapping: Optional[mmap.mmap] = None) -> None:
+        self.row_count = row_count
+        self.groups = tuple(tuple(group) for group in groups)
+        self.tables = list(tables)
+        # Keeps the mapping alive for as long as the tables are in use
+        self._mapping = mapping
+
+    @classmethod
+    def build(cls, row_count: int, groups: Optional[Sequence[Sequence[int]]] = None) -> "PatternDatabase":
+        """
+        Raises
+        ------
+        ValueError
+            If `groups` are not disjoint sets of tiles of the board
+        """
+        if groups is None:
+            groups = DEFAULT_PARTITIONS[row_count]
+        tiles = [tile for group in groups for tile in group]
+        if len(set(tiles)) != len(tiles) or not all(0 < tile < row_count * row_count for tile in tiles):
+            raise ValueError(f"groups {groups} are not disjoint sets of tiles of a {row_count}x{row_count} board")
+        return cls(row_count, groups, [_build_table(row_count, group) for group in groups])
+
+    def save(self, path: str) -> None:
+        """Write the tables to `path` atomically."""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(_HEADER.pack(FILE_MAGIC, FORMAT_VERSION, self.row_count, len(self.groups)))
+            for group in self.groups:
+                file.write(bytes([len(group), *group]))
+            for table in self.tables:
+                file.write(table)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PatternDatabase":
+        """
+        Memory-map the tables stored at `path`.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a pattern database of the current format version
+        """
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, row_count, group_count = _HEADER.unpack_from(mapping, 0)
+            if magic != FILE_MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} pattern database")
+            offset = _HEADER.size
+            groups = []
+            for _ in range(group_count):
+                group_size = mapping[offset]
+                groups.append(tuple(mapping[offset + 1:offset + 1 + group_size]))
+                offset += 1 + group_size
+            cells = row_count * row_count
+            table_sizes = [get_placement_count(cells, len(group)) for group in groups]
+            if offset + sum(table_sizes) != len(mapping):
+                raise ValueError(f"{path} is truncated or has trailing data")
+        except ValueError:
+            mapping.close()
+            raise
+        except (struct.error, IndexError):
+            mapping.close()
+            raise ValueError(f"{path} is truncated")
+
+        view = memoryview(mapping)
+        tables = []
+        for table_size in table_sizes:
+            tables.append(view[offset:offset + table_size])
+            offset += table_size
+        return cls(row_count, groups, tables, mapping)
+
+
+class PatternDatabaseHeuristic(Heuristic):
+    """Sum of the pattern database values of every group, updated per move."""
+
+    def __init__(self, database: PatternDatabase) -> None:
+        self.database = database
+        cells = database.row_count * database.row_count
+        # The group of every tile and its order within the group (-1 for tiles in no group)
+        self.group_of = [-1] * cells
+        self.order_of = [-1] * cells
+        for group_index, group in enumerate(database.groups):
+            for i, tile in enumerate(group):
+                self.group_of[tile] = group_index
+                self.order_of[tile] = i
+        self.weights = [_get_rank_weights(cells, len(group)) for group in database.groups]
+        self.tables = database.tables
+        self.board: List[int] = []
+        self.indices = [0] * len(database.groups)
+        self.values = [0] * len(database.groups)
+        self.total = 0
+
+    def reset(self, board: Sequence[int]) -> int:
+        self.board = list(board)
+        positions = [[0] * len(group) for group in self.database.groups]
+        for pos, tile in enumerate(self.board):
+            group_index = self.group_of[tile]
+            if group_index >= 0:
+                positions[group_index][self.order_of[tile]] = pos
+        self.indices = [_rank(group_positions, weights) for group_positions, weights in zip(positions, self.weights)]
+        self.values = [table[index] for table, index in zip(self.tables, self.indices)]
+        self.total = sum(self.values)
+        return self.total
+
+    def slide(self, tile: int, src: int, dst: int) -> int:
+        board = self.board
+        board[dst] = tile
+        board[src] = 0
+        group_index = self.group_of[tile]
+        if group_index < 0:
+            return self.total
+        order = self.order_of[tile]
+        weights = self.weights[group_index]
+        if dst - src == 1 or src - dst == 1:
+            index = self.indices[group_index] + (dst - src) * weights[order]
+        else:
+            # A vertical move passes the squares of a row: the tiles of the group among them change
+            # how many squares the rank digits skip
+            index = self.indices[group_index]
+            digit_change = dst - src
+            step = 1 if dst > src else -1
+            group_of = self.group_of
+            for pos in range(min(src, dst) + 1, max(src, dst)):
+                other = board[pos]
+                if group_of[other] == group_index:
+                    other_order = self.order_of[other]
+                    if other_order < order:
+                        digit_change -= step
+                    else:
+                        index += step * weights[other_order]
+            index += digit_change * weights[order]
+        self.indices[group_index] = index
+        value = self.tables[group_index][index]
+        self.total += value - self.values[group_index]
+        self.values[group_index] = value
+        return self.total
+
+
+def get_cache_dir() -> str:
+    """`$SLIDE_PUZZLE_CACHE` if set, otherwise `~/.cache/slide-puzzle`."""
+    return os.environ.get("SLIDE_PUZZLE_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "slide-puzzle")
+
+
+def get_cache_path(row_count: int, groups: Sequence[Sequence[int]]) -> str:
+    partition = "-".join(".".join(map(str, group)) for group in groups)
+    return os.path.join(get_cache_dir(), f"pdb-v{FORMAT_VERSION}-{row_count}x{row_count}-{partition}.bin")
+
+
+_loaded: Dict[Tuple[int, Tuple[Tuple[int, ...], ...]], PatternDatabase] = {}
+
+
+def is_database_available(row_count: int, groups: Optional[Sequence[Sequence[int]]] = None) -> bool:
+    """
+    Whether `load_database` returns without a long build: the database is loaded or cached,
+    or the board is small enough to build it on demand (see `ON_DEMAND_MAX_ROW_COUNT`).
+    """
+    if groups is None:
+        if row_count not in DEFAULT_PARTITIONS:
+            return False
+        groups = DEFAULT_PARTITIONS[row_count]
+    return (row_count <= ON_DEMAND_MAX_ROW_COUNT or (row_count, tuple(tuple(group) for group in groups)) in _loaded
+            or os.path.exists(get_cache_path(row_count, groups)))
+
+
+def load_database(row_count: int, groups: Optional[Sequence[Sequence[int]]] = None,
+                  build: bool = True) -> PatternDatabase:
+    """
+    Load the pattern database of a board size from the cache, building and saving it first if needed.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the database is not cached and `build` is False
+    """
+    if groups is None:
+        groups = DEFAULT_PARTITIONS[row_count]
+    key = (row_count, tuple(tuple(group) for group in groups))
+    database = _loaded.get(key)
+    if database is not None:
+        return database
+
+    path = get_cache_path(row_count, groups)
+    try:
+        database = PatternDatabase.load(path)
+    except (FileNotFoundError, ValueError):
+        if not build:
+            raise FileNotFoundError(f"No pattern database cached at {path}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        PatternDatabase.build(row_count, groups).save(path)
+        database = PatternDatabase.load(path)
+    _loaded[key] = database
+    return database
+
+
+def load_heuristic(row_count: int, groups: Optional[Sequence[Sequence[int]]] = None,
+                   build: bool = True) -> PatternDatabaseHeuristic:
+    """A fresh heuristic for `solve` backed by the (shared) cached database."""
+    return PatternDatabaseHeuristic(load_database(row_count, groups, build))
+
+
+def _parse_groups(text: str) -> List[Tuple[int, ...]]:
+    return [tuple(int(tile) for tile in group.split(",")) for group in text.split("/")]
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build and cache additive pattern databases.")
+    parser.add_argument("--size", type=int, default=4, help="row count of the board (default: 4)")
+    parser.add_argument("--groups", type=_parse_groups, default=None,
+                        help="tile groups like 1,2,3,5,6/4,7,8,11,12/9,10,13,14,15 (default: built-in partition)")
+    args = parser.parse_args(argv)
+
+    groups = args.groups or DEFAULT_PARTITIONS[args.size]
+    path = get_cache_path(args.size, groups)
+    start = time.perf_counter()
+    database = load_database(args.size, groups)
+    print(f"{path}: {[len(table) for table in database.tables]} bytes per table, "
+          f"ready in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    _main()
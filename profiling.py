@@ -0,0 +1,93 @@
+"""
+Per-frame timings of the game loop, recorded when the game runs with `--profile`.
+
+Every frame is split into the sections of `FRAME_SECTIONS`: handling the events, updating the
+scheduled tasks (and the hint) and drawing. Time spent waiting for events is not part of a frame.
+"""
+import csv
+import time
+from typing import List, NamedTuple, Optional, Sequence
+
+FRAME_SECTIONS = ("events", "update", "draw")
+
+SUMMARY_FRAME_COUNT = 120
+"""The number of most recent frames that `FrameProfiler.summary` covers."""
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """The value below which `fraction` of `sorted_values` (sorted in increasing order) are, by nearest rank."""
+    if not sorted_values:
+        raise ValueError("no values")
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))]
+
+
+class FrameTiming(NamedTuple):
+    frame: int
+    start: float
+    """Seconds since the profiler was created."""
+    durations: Sequence[float]
+    """Seconds spent in every section of `FRAME_SECTIONS`, in that order."""
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations)
+
+
+class FrameProfiler:
+    """
+    Records frames by calling `start_frame`, `lap` at the end of every section of `FRAME_SECTIONS`
+    (in order), then `end_frame`.
+    """
+
+    def __init__(self) -> None:
+        self.frames: List[FrameTiming] = []
+        self.created = time.perf_counter()
+        self.frame_start: Optional[float] = None
+        self.last_lap = 0.0
+        self.durations: List[float] = []
+
+    def start_frame(self) -> None:
+        self.frame_start = self.last_lap = time.perf_counter()
+        self.durations = []
+
+    def lap(self, section: str) -> None:
+        """End the current section of the frame, which must be `section`."""
+        if self.frame_start is None:
+            raise ValueError("lap outside of a frame")
+        if FRAME_SECTIONS[len(self.durations)] != section:
+            raise ValueError(f"expected the {FRAME_SECTIONS[len(self.durations)]} section, not {section}")
+        now = time.perf_counter()
+        self.durations.append(now - self.last_lap)
+        self.last_lap = now
+
+    def end_frame(self) -> None:
+        if len(self.durations) != len(FRAME_SECTIONS):
+            raise ValueError(f"a frame has the sections {FRAME_SECTIONS}, got {len(self.durations)}")
+        self.frames.append(FrameTiming(len(self.frames), self.frame_start - self.created, tuple(self.durations)))
+        self.frame_start = None
+
+    def summary(self) -> List[str]:
+        """
+        Lines with the mean and 95th percentile of every section (and the whole frame) in milliseconds,
+        over the last `SUMMARY_FRAME_COUNT` frames.
+        """
+        frames = self.frames[-SUMMARY_FRAME_COUNT:]
+        if not frames:
+            return ["no frames yet"]
+        columns = [[frame.durations[i] for frame in frames] for i in range(len(FRAME_SECTIONS))]
+        columns.append([frame.total for frame in frames])
+        lines = [f"last {len(frames)} frames (ms): mean / p95"]
+        for name, values in zip((*FRAME_SECTIONS, "frame"), columns):
+            lines.append(f"{name:>6} {sum(values) / len(values) * 1000:7.3f} "
+                         f"{percentile(sorted(values), 0.95) * 1000:7.3f}")
+        return lines
+
+    def write_csv(self, path: str) -> None:
+        """Write every frame, one per row, with its start and section durations in milliseconds."""
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "start_ms", *(f"{name}_ms" for name in FRAME_SECTIONS), "total_ms"])
+            for frame in self.frames:
+                writer.writerow([frame.frame, f"{frame.start * 1000:.3f}",
+                                 *(f"{duration * 1000:.4f}" for duration in frame.durations),
+                                 f"{frame.total * 1000:.4f}"])
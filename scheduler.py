@@ -0,0 +1,97 @@
+"""
+Time-based tasks of the game loop.
+
+The loop asks the `Scheduler` how long it may sleep: `None` means nothing is scheduled and it can
+block until the next input event, 0 means a task needs every frame (e.g. an animation).
+Times are integer milliseconds, as returned by `pg.time.get_ticks()`.
+"""
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Task(ABC):
+    """A scheduled piece of work. `update` is called once `next_update` is reached."""
+
+    def __init__(self, next_update: int) -> None:
+        self.next_update = next_update
+
+    @abstractmethod
+    def update(self, now: int) -> bool:
+        """Returns whether the task should keep running."""
+
+
+class Animation(Task):
+    """Calls `on_progress` with the progress (0 to 1) of `duration` ms from `start`, every frame."""
+
+    def __init__(self, start: int, duration: int, on_progress: Callable[[float], None]) -> None:
+        super().__init__(start)
+        self.start = start
+        self.duration = duration
+        self.on_progress = on_progress
+
+    def update(self, now: int) -> bool:
+        progress = min(1.0, (now - self.start) / self.duration) if self.duration > 0 else 1.0
+        self.on_progress(progress)
+        return progress < 1.0
+
+
+class Interval(Task):
+    """Calls `callback` every `interval` ms after `start` for as long as it returns True."""
+
+    def __init__(self, start: int, interval: int, callback: Callable[[], bool]) -> None:
+        super().__init__(start + interval)
+        self.interval = interval
+        self.callback = callback
+
+    def update(self, now: int) -> bool:
+        # Keep to the original schedule, skipping the intervals that were missed
+        missed = (now - self.next_update) // self.interval
+        self.next_update += (missed + 1) * self.interval
+        return self.callback()
+
+
+def run_in_background(function: Callable[[], T]) -> "Future[T]":
+    """
+    Call `function` in a daemon thread (closing the window does not wait for it), for work too slow for a frame.
+    The returned future holds its result or exception, poll it with `done()` from the game loop.
+    """
+    future: "Future[T]" = Future()
+
+    def run() -> None:
+        try:
+            future.set_result(function())
+        except Exception as error:
+            future.set_exception(error)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self.tasks: List[Task] = []
+
+    def add(self, task: Task) -> Task:
+        self.tasks.append(task)
+        return task
+
+    def cancel(self, task: Optional[Task]) -> None:
+        """Remove `task` if it is still scheduled."""
+        if task in self.tasks:
+            self.tasks.remove(task)
+
+    def time_until_next(self, now: int) -> Optional[int]:
+        """Milliseconds until a task needs an update, or None if no task is scheduled."""
+        if not self.tasks:
+            return None
+        return max(0, min(task.next_update for task in self.tasks) - now)
+
+    def update(self, now: int) -> None:
+        """Update every task that is due and drop the finished ones."""
+        for task in list(self.tasks):
+            if task.next_update <= now and not task.update(now):
+                self.cancel(task)
@@ -0,0 +1,301 @@
+"""
+Optimal solver for the slide puzzle.
+
+Boards use the same format as `SlidePuzzle.py`: a flat list of integers where 0 is the
+empty square and the solved board is `[1, 2, ..., n - 1, 0]`.
+
+Run as a script to solve a board and print a node-count / nodes-per-second report:
+    python solver.py 8 6 7 2 5 4 3 0 1
+    python solver.py --size 4 --count 5 --seed 1 --pdb
+"""
+import argparse
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from engine.board import get_neighbour_table, get_row_count, is_solvable
+
+# Marker returned by the depth-first search once the goal is reached
+_FOUND = -1
+
+
+def _line_conflict_cost(goal_offsets: Tuple[int, ...]) -> int:
+    """
+    Extra moves needed by tiles that are in their goal line but in reversed order.
+
+    `goal_offsets` holds the goal offset (within the line) of every tile that already
+    sits in its goal line, in the order they appear. Every tile that is not part of the
+    longest increasing run has to leave the line and come back, which costs 2 moves.
+    """
+    # Longest increasing subsequence, lines are at most a few dozen tiles long
+    longest = [1] * len(goal_offsets)
+    for i in range(len(goal_offsets)):
+        for j in range(i):
+            if goal_offsets[j] < goal_offsets[i] and longest[j] + 1 > longest[i]:
+                longest[i] = longest[j] + 1
+    return 2 * (len(goal_offsets) - max(longest, default=0))
+
+
+class Heuristic(ABC):
+    """
+    Interface of the admissible heuristics used by `solve`.
+
+    Call `reset` with the starting board, then `slide` for every move made (and again with
+    swapped indices to undo it). Both return the heuristic value of the resulting board.
+    """
+
+    @abstractmethod
+    def reset(self, board: Sequence[int]) -> int:
+        pass
+
+    @abstractmethod
+    def slide(self, tile: int, src: int, dst: int) -> int:
+        """Move `tile` from `src` into the empty square at `dst`."""
+
+
+class ManhattanLinearConflict(Heuristic):
+    """Manhattan distance plus linear-conflict heuristic with incremental updates."""
+
+    def __init__(self, row_count: int) -> None:
+        self.row_count = row_count
+        board_length = row_count * row_count
+        # distance[tile][pos] is the Manhattan distance of `tile` placed at `pos`
+        self.distance = [[0] * board_length for _ in range(board_length)]
+        for tile in range(1, board_length):
+            goal_row, goal_column = divmod(tile - 1, row_count)
+            for pos in range(board_length):
+                row, column = divmod(pos, row_count)
+                self.distance[tile][pos] = abs(row - goal_row) + abs(column - goal_column)
+        # Conflict cost of every row / column keyed by the squares it holds, filled lazily
+        self._row_costs: List[Dict[Tuple[int, ...], int]] = [{} for _ in range(row_count)]
+        self._column_costs: List[Dict[Tuple[int, ...], int]] = [{} for _ in range(row_count)]
+        self.board: List[int] = []
+        self.manhattan = 0
+        self.row_conflicts = [0] * row_count
+        self.column_conflicts = [0] * row_count
+        self.conflicts = 0
+
+    def _row_conflict(self, row: int) -> int:
+        row_count = self.row_count
+        start = row * row_count
+        line = tuple(self.board[start:start + row_count])
+        cache = self._row_costs[row]
+        cost = cache.get(line)
+        if cost is None:
+            cost = cache[line] = _line_conflict_cost(
+                tuple((tile - 1) % row_count for tile in line if tile and (tile - 1) // row_count == row))
+        return cost
+
+    def _column_conflict(self, column: int) -> int:
+        row_count = self.row_count
+        line = tuple(self.board[column::row_count])
+        cache = self._column_costs[column]
+        cost = cache.get(line)
+        if cost is None:
+            cost = cache[line] = _line_conflict_cost(
+                tuple((tile - 1) // row_count for tile in line if tile and (tile - 1) % row_count == column))
+        return cost
+
+    def reset(self, board: Sequence[int]) -> int:
+        self.board = list(board)
+        self.manhattan = sum(self.distance[tile][pos] for pos, tile in enumerate(self.board) if tile)
+        self.row_conflicts = [self._row_conflict(row) for row in range(self.row_count)]
+        self.column_conflicts = [self._column_conflict(column) for column in range(self.row_count)]
+        self.conflicts = sum(self.row_conflicts) + sum(self.column_conflicts)
+        return self.manhattan + self.conflicts
+
+    def slide(self, tile: int, src: int, dst: int) -> int:
+        board = self.board
+        board[dst] = tile
+        board[src] = 0
+        distance = self.distance[tile]
+        self.manhattan += distance[dst] - distance[src]
+
+        row_count = self.row_count
+        if src - dst in (1, -1):
+            # Horizontal move: the order within the row is unchanged, two columns changed
+            for column in (src % row_count, dst % row_count):
+                cost = self._column_conflict(column)
+                self.conflicts += cost - self.column_conflicts[column]
+                self.column_conflicts[column] = cost
+        else:
+            # Vertical move: the order within the column is unchanged, two rows changed
+            for row in (src // row_count, dst // row_count):
+                cost = self._row_conflict(row)
+                self.conflicts += cost - self.row_conflicts[row]
+                self.row_conflicts[row] = cost
+        return self.manhattan + self.conflicts
+
+
+class SolveResult(NamedTuple):
+    moves: List[int]
+    """Indices of the squares to slide into the empty square, in order."""
+    nodes: int
+    """Number of boards generated by the search."""
+    seconds: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else float("inf")
+
+    def report(self) -> str:
+        return (f"{len(self.moves)} moves, {self.nodes} nodes in {self.seconds * 1000:.2f} ms "
+                f"({self.nodes_per_second:,.0f} nodes/s)")
+
+
+def get_default_heuristic(row_count: int) -> Heuristic:
+    """
+    A fresh heuristic for boards of `row_count` rows: the pattern database of the size if it is available
+    (see `pattern_database.is_database_available`, the 3x3 one is built on first use) and Manhattan
+    distance plus linear conflict otherwise.
+    """
+    # pattern_database imports this module
+    from pattern_database import is_database_available, load_heuristic
+    if is_database_available(row_count):
+        return load_heuristic(row_count)
+    return ManhattanLinearConflict(row_count)
+
+
+def solve(board: Sequence[int], heuristic: Optional[Heuristic] = None, lower_bound: int = 0) -> SolveResult:
+    """
+    Find a shortest solution with IDA*.
+
+    Parameters
+    ----------
+    `board`:
+        The board to solve, a `Board` or the flat list format used by `draw_window`. It is not modified.
+
+    `heuristic`:
+        An admissible `Heuristic` for the board size, `get_default_heuristic(row_count)` by default.
+
+    `lower_bound`:
+        A known lower bound of the solution length, the search starts from it if it is above the heuristic.
+
+    Returns
+    -------
+    A `SolveResult` holding the moves as the indices of the squares to slide (the index that
+    would be clicked in `handle_square_sliding`) together with the search statistics.
+
+    Raises
+    ------
+    ValueError
+        If `board` is not a permutation of 0..n-1 with n a perfect square, or it cannot be solved
+    """
+    result = solve_bounded(board, heuristic, lower_bound)
+    assert result is not None
+    return result
+
+
+def solve_bounded(board: Sequence[int], heuristic: Optional[Heuristic] = None, lower_bound: int = 0,
+                  max_length: Optional[int] = None) -> Optional[SolveResult]:
+    """
+    Like `solve`, but gives up and returns None once it is known that no solution of at most `max_length` moves exists.
+    """
+    board = list(board)
+    row_count = get_row_count(len(board))
+    if sorted(board) != list(range(len(board))):
+        raise ValueError("board must be a permutation of the numbers 0 to n - 1")
+    if not is_solvable(board):
+        raise ValueError("board is not solvable")
+
+    if heuristic is None:
+        heuristic = get_default_heuristic(row_count)
+    neighbours = get_neighbour_table(row_count)
+    goal = list(range(1, len(board))) + [0]
+    state = list(board)
+    path: List[int] = []
+    nodes = 0
+    slide = heuristic.slide
+
+    def search(empty: int, previous: int, g: int, h: int, bound: int) -> int:
+        nonlocal nodes
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0 and state == goal:
+            return _FOUND
+        minimum = math.inf
+        g += 1
+        for pos in neighbours[empty]:
+            # Never slide back the square that just moved
+            if pos == previous:
+                continue
+            nodes += 1
+            tile = state[pos]
+            state[empty] = tile
+            state[pos] = 0
+            path.append(pos)
+            result = search(pos, empty, g, slide(tile, pos, empty), bound)
+            if result == _FOUND:
+                return _FOUND
+            path.pop()
+            slide(tile, empty, pos)
+            state[pos] = tile
+            state[empty] = 0
+            if result < minimum:
+                minimum = result
+        return minimum
+
+    start = time.perf_counter()
+    h = heuristic.reset(state)
+    bound = max(h, lower_bound)
+    empty = state.index(0)
+    while max_length is None or bound <= max_length:
+        result = search(empty, -1, 0, h, bound)
+        if result == _FOUND:
+            return SolveResult(path, nodes, time.perf_counter() - start)
+        bound = result
+    return None
+
+
+def random_solvable_board(row_count: int, rng: Optional[random.Random] = None) -> List[int]:
+    """Uniformly random solvable board, used for benchmarking the solver."""
+    rng = rng or random.Random()
+    board = list(range(row_count * row_count))
+    rng.shuffle(board)
+    if not is_solvable(board):
+        # Swapping two non-empty squares flips the permutation parity
+        first, second = [pos for pos, sq_num in enumerate(board) if sq_num != 0][:2]
+        board[first], board[second] = board[second], board[first]
+    return board
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Solve slide puzzle boards optimally and report search statistics.")
+    parser.add_argument("board", nargs="*", type=int, help="board to solve as a flat list, 0 is the empty square")
+    parser.add_argument("--size", type=int, default=3, help="row count of the random boards (default: 3)")
+    parser.add_argument("--count", type=int, default=1, help="number of random boards to solve (default: 1)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the random boards")
+    parser.add_argument("--pdb", action="store_true",
+                        help="build the pattern database of the size if it is not cached (cached ones are always used)")
+    args = parser.parse_args(argv)
+
+    if args.board:
+        boards = [args.board]
+    else:
+        rng = random.Random(args.seed)
+        boards = [random_solvable_board(args.size, rng) for _ in range(args.count)]
+
+    total_nodes = 0
+    total_seconds = 0.0
+    for board in boards:
+        heuristic = None
+        if args.pdb:
+            from pattern_database import load_heuristic
+            heuristic = load_heuristic(get_row_count(len(board)))
+        result = solve(board, heuristic)
+        total_nodes += result.nodes
+        total_seconds += result.seconds
+        print(board)
+        print(f"  {result.report()}")
+        print(f"  moves: {result.moves}")
+    if len(boards) > 1:
+        total = SolveResult([], total_nodes, total_seconds)
+        print(f"total: {total.nodes} nodes in {total.seconds * 1000:.2f} ms "
+              f"({total.nodes_per_second:,.0f} nodes/s)")
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,49 @@
+from typing import Dict
+
+import pytest
+
+from corpus import Corpus, build_corpus, get_bucket_path
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("SLIDE_PUZZLE_CACHE", str(tmp_path / "cache"))
+
+
+def build(path: str, board_count: int) -> Corpus:
+    return build_corpus(path, 3, board_count, seed=1, chunk_size=10, workers=1, log=None)
+
+
+def read_buckets(corpus: Corpus) -> Dict[int, bytes]:
+    buckets = {}
+    for length in corpus.lengths():
+        with open(get_bucket_path(corpus.path, length), "rb") as bucket:
+            buckets[length] = bucket.read()
+    return buckets
+
+
+def test_extending_a_build_matches_a_fresh_build(tmp_path):
+    fresh = build(str(tmp_path / "fresh"), 25)
+    path = str(tmp_path / "extended")
+    build(path, 15)
+    extended = build(path, 25)
+    assert sum(extended.count(length) for length in extended.lengths()) == 25
+    assert read_buckets(extended) == read_buckets(fresh)
+
+
+def test_resume_drops_unrecorded_records(tmp_path):
+    fresh = build(str(tmp_path / "fresh"), 25)
+    path = str(tmp_path / "resumed")
+    corpus = build(path, 15)
+    # Records of a chunk that was interrupted before corpus.json was updated
+    with open(get_bucket_path(path, corpus.lengths()[0]), "ab") as bucket:
+        bucket.write(bytes(range(9)) * 3)
+    resumed = build(path, 25)
+    assert read_buckets(resumed) == read_buckets(fresh)
+
+
+def test_other_parameters_are_rejected(tmp_path):
+    path = str(tmp_path / "corpus")
+    build(path, 5)
+    with pytest.raises(ValueError):
+        build_corpus(path, 3, 5, seed=2, chunk_size=10, workers=1, log=None)
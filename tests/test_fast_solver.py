@@ -0,0 +1,48 @@
+import random
+from typing import Sequence
+
+import pytest
+
+from engine import Board
+from fast_solver import _Reducer, remove_redundant_moves, solve_fast
+from solver import random_solvable_board
+
+
+def replay(board: Sequence[int], moves: Sequence[int]) -> Board:
+    position = Board.from_list(board)
+    for pos in moves:
+        assert position.can_slide(pos)
+        position.slide(pos)
+    return position
+
+
+@pytest.mark.parametrize("row_count", [2, 3, 4, 7, 10])
+def test_solutions_solve_the_board(row_count):
+    rng = random.Random(row_count)
+    for _ in range(20 if row_count < 10 else 3):
+        board = random_solvable_board(row_count, rng)
+        assert replay(board, solve_fast(board)).is_solved()
+
+
+@pytest.mark.parametrize("row_count", [2, 3, 4, 7, 10])
+def test_remove_redundant_moves_never_adds_moves(row_count):
+    rng = random.Random(row_count)
+    for _ in range(5):
+        board = random_solvable_board(row_count, rng)
+        moves = _Reducer(board).solve()
+        shortened = remove_redundant_moves(board, moves)
+        assert len(shortened) <= len(moves)
+        assert replay(board, shortened) == replay(board, moves)
+
+
+def test_remove_redundant_moves_shortens_random_walks():
+    rng = random.Random(0)
+    board = random_solvable_board(4, rng)
+    position = Board.from_list(board)
+    moves = []
+    for _ in range(200):
+        moves.append(rng.choice(position.valid_moves()))
+        position.slide(moves[-1])
+    shortened = remove_redundant_moves(board, moves)
+    assert len(shortened) < len(moves)
+    assert replay(board, shortened) == position
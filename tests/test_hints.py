@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from engine import Board
+from hints import HintService
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("SLIDE_PUZZLE_CACHE", str(tmp_path / "cache"))
+
+
+def wait_for_hint(service: HintService, board: Board) -> int:
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        move = service.poll_hint(board)
+        if move is not None:
+            return move
+        time.sleep(0.001)
+    raise AssertionError("no hint found in time")
+
+
+def test_poll_hint_searches_in_the_background():
+    board = Board.from_list([8, 6, 7, 2, 5, 4, 3, 0, 1])
+    service = HintService(3)
+    assert service.poll_hint(board) is None
+    assert service.pending is not None
+    assert wait_for_hint(service, board) == HintService(3).hint(board)
+
+
+def test_following_poll_hints_solves_without_searching_again():
+    board = Board.from_list([8, 6, 7, 2, 5, 4, 3, 0, 1])
+    service = HintService(3)
+    moves = 0
+    while not board.is_solved():
+        board.slide(wait_for_hint(service, board))
+        moves += 1
+    assert moves == 31
+    assert service.searches == 1
+    assert service.poll_hint(board) is None
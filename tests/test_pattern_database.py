@@ -0,0 +1,100 @@
+import random
+import struct
+from collections import deque
+from itertools import permutations
+
+import pytest
+
+from engine.board import get_neighbour_table
+from pattern_database import (FILE_MAGIC, FORMAT_VERSION, PatternDatabase, PatternDatabaseHeuristic, _HEADER,
+                              _get_rank_weights, _rank, _unrank, get_placement_count)
+from solver import random_solvable_board
+
+# Small groups of 4x4 tiles build in well under a second
+SMALL_4X4_GROUPS = ((1, 2, 5), (3, 4, 8, 12), (6, 11))
+
+
+def test_rank_is_a_bijection():
+    weights = _get_rank_weights(9, 3)
+    ranks = sorted(_rank(positions, weights) for positions in permutations(range(9), 3))
+    assert ranks == list(range(get_placement_count(9, 3)))
+    for positions in permutations(range(9), 3):
+        assert _unrank(_rank(positions, weights), weights) == list(positions)
+
+
+def test_3x3_table_never_overestimates():
+    # Distances of every solvable 3x3 board from the solved one
+    neighbours = get_neighbour_table(3)
+    solved = (1, 2, 3, 4, 5, 6, 7, 8, 0)
+    distances = {solved: 0}
+    queue = deque([(solved, 8)])
+    while queue:
+        board, empty = queue.popleft()
+        for pos in neighbours[empty]:
+            next_board = list(board)
+            next_board[empty], next_board[pos] = board[pos], 0
+            next_board = tuple(next_board)
+            if next_board not in distances:
+                distances[next_board] = distances[board] + 1
+                queue.append((next_board, pos))
+    assert len(distances) == 181440
+
+    heuristic = PatternDatabaseHeuristic(PatternDatabase.build(3))
+    exact = 0
+    for board, distance in distances.items():
+        value = heuristic.reset(board)
+        assert value <= distance
+        exact += value == distance
+    assert heuristic.reset(solved) == 0
+    # A useful heuristic, not only an admissible one
+    assert exact > len(distances) // 10
+
+
+@pytest.mark.parametrize("row_count, groups", [(3, None), (4, SMALL_4X4_GROUPS)])
+def test_slide_matches_reset(row_count, groups):
+    database = PatternDatabase.build(row_count, groups)
+    heuristic = PatternDatabaseHeuristic(database)
+    fresh = PatternDatabaseHeuristic(database)
+    rng = random.Random(row_count)
+    board = random_solvable_board(row_count, rng)
+    heuristic.reset(board)
+    neighbours = get_neighbour_table(row_count)
+    empty = board.index(0)
+    for _ in range(5000):
+        pos = rng.choice(neighbours[empty])
+        tile = board[pos]
+        value = heuristic.slide(tile, pos, empty)
+        board[empty], board[pos] = tile, 0
+        empty = pos
+        assert value == fresh.reset(board)
+        assert heuristic.indices == fresh.indices
+
+
+def test_save_and_load(tmp_path):
+    database = PatternDatabase.build(4, SMALL_4X4_GROUPS)
+    path = str(tmp_path / "pdb.bin")
+    database.save(path)
+    loaded = PatternDatabase.load(path)
+    assert loaded.row_count == 4
+    assert loaded.groups == SMALL_4X4_GROUPS
+    assert [bytes(table) for table in loaded.tables] == [bytes(table) for table in database.tables]
+
+
+def test_load_rejects_other_versions(tmp_path):
+    path = tmp_path / "pdb.bin"
+    PatternDatabase.build(3).save(str(path))
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<H", data, len(FILE_MAGIC), FORMAT_VERSION + 1)
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        PatternDatabase.load(str(path))
+
+
+@pytest.mark.parametrize("size", [_HEADER.size - 1, _HEADER.size + 3, -1])
+def test_load_rejects_truncated_files(tmp_path, size):
+    path = tmp_path / "pdb.bin"
+    PatternDatabase.build(3).save(str(path))
+    data = path.read_bytes()
+    path.write_bytes(data[:size])
+    with pytest.raises(ValueError):
+        PatternDatabase.load(str(path))